@@ -25,6 +25,7 @@ import logging
 import bcrypt
 import backblaze
 import aioftp
+import aioredis
 
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
@@ -54,16 +55,26 @@ from .settings import (
     LocalUploadSettings,
     StripeSettings,
     SmtpSettings,
-    WebhookSettings
+    WebhookSettings,
+    CacheSettings,
+    CompressionSettings,
+    WebsocketSettings
 )
-from .middlewares import APIAuthentication
+from .middlewares import APIAuthentication, CompressionMiddleware
 
 from .routes import ROUTES, ERROR_HANDLERS
 from .routes.errors import auth_error
 
-from .background_tasks import TASKS_TO_SPAWN
+from .background_tasks import (
+    TASKS_TO_SPAWN,
+    cache_invalidator,
+    metrics_reporter
+)
 
 from .misc import cache_community_types
+from .caches import LocalCache, ORJSONSerializer
+from .broadcast import use_manager
+from .websocket_server import MeteredRedisManager
 
 from .key_loader import KeyLoader
 
@@ -99,6 +110,11 @@ class SQLMatches(Starlette):
                  timestamp_format: str = "%m/%d/%Y-%H:%M:%S",
                  community_types: List[str] = COMMUNITY_TYPES,
                  webhook_settings: WebhookSettings = WebhookSettings(),
+                 cache_settings: CacheSettings = CacheSettings(),
+                 compression_settings: CompressionSettings = (
+                     CompressionSettings()
+                 ),
+                 websocket_settings: WebsocketSettings = WebsocketSettings(),
                  match_max_length: timedelta = timedelta(hours=3),
                  demo_expires: timedelta = timedelta(weeks=20),
                  subscription_length: timedelta = timedelta(days=31),
@@ -119,17 +135,25 @@ class SQLMatches(Starlette):
         map_images : Dict[str, str], optional
             by default MAP_IMAGES
         upload_delay : float, optional
-            by default 0.00001
+            Seconds slept after each chunk of a demo upload is
+            received, for local & b2 uploads, by default 0.00001
         free_upload_size : float, optional
             by default 50.0
         max_upload_size : float, optional
             by default 100.0
         timestamp_format : str, optional
+            strftime format, "iso" or "epoch",
             by default "%m/%d/%Y-%H:%M:%S"
         community_types : List[str], optional
             by default COMMUNITY_TYPES
         webhook_settings : WebhookSettings, optional
             by default WebhookSettings()
+        cache_settings : CacheSettings, optional
+            by default CacheSettings()
+        compression_settings : CompressionSettings, optional
+            by default CompressionSettings()
+        websocket_settings : WebsocketSettings, optional
+            by default WebsocketSettings()
         match_max_length : timedelta, optional
             by default timedelta(hours=3)
         clear_cache : bool, optional
@@ -148,6 +172,8 @@ class SQLMatches(Starlette):
             shutdown_tasks = shutdown_tasks + kwargs["on_shutdown"]
 
         middlewares = [
+            Middleware(CompressionMiddleware,
+                       minimum_size=compression_settings.minimum_size),
             Middleware(SessionMiddleware,
                        secret_key=KeyLoader(name="session").load()),
             Middleware(AuthenticationMiddleware, backend=APIAuthentication(),
@@ -180,6 +206,11 @@ class SQLMatches(Starlette):
 
         Config.url = friendly_url
         Config.map_images = map_images
+        Config.cover_images = {
+            map_name: "{}maps/{}".format(friendly_url, image)
+            for map_name, image in map_images.items()
+        }
+        Config.invalid_cover_image = friendly_url + "maps/invalid.png"
         Config.upload_delay = upload_delay
         Config.free_upload_size = free_upload_size
         Config.max_upload_size = max_upload_size
@@ -197,6 +228,19 @@ class SQLMatches(Starlette):
         Config.webhook_round_end = webhook_settings.round_end
         Config.webhook_key = webhook_settings.key
 
+        Config.local_cache_size = cache_settings.local_size
+        Config.local_cache_ttl = cache_settings.local_ttl
+        Config.cache_soft_ttl = cache_settings.soft_ttl
+        Config.cache_hard_ttl = cache_settings.hard_ttl
+        Config.listing_pages = cache_settings.listing_pages
+        Config.negative_ttl = cache_settings.negative_ttl
+        Config.browser_max_age = cache_settings.browser_max_age
+        Config.shared_max_age = cache_settings.shared_max_age
+        Config.purge_url = cache_settings.purge_url
+
+        Config.compress_min_size = compression_settings.minimum_size
+        Config.precompress = compression_settings.precompress
+
         Config.match_max_length = match_max_length
         Config.system_email = system_email
         Config.frontend_url = frontend_url
@@ -206,6 +250,10 @@ class SQLMatches(Starlette):
 
         self.community_types = community_types
         self.clear_cache = clear_cache
+        self.websocket_settings = websocket_settings
+
+        Config.emit_window = websocket_settings.emit_window
+        Sessions.websocket.max_queued = websocket_settings.max_queued
 
         database_url = "://{}:{}@{}:{}/{}?charset=utf8mb4".format(
             database_settings.username,
@@ -300,15 +348,37 @@ class SQLMatches(Starlette):
         await Sessions.database.connect()
         Sessions.aiohttp = ClientSession()
 
+        Sessions.local_cache = LocalCache(
+            Config.local_cache_size,
+            Config.local_cache_ttl
+        )
+
         try:
-            Sessions.cache = Cache(Cache.REDIS)
+            Sessions.cache = Cache(Cache.REDIS, serializer=ORJSONSerializer())
             await Sessions.cache.exists("connection")
+
+            # Used to publish local cache invalidations.
+            Sessions.redis = await aioredis.create_redis(
+                (Sessions.cache.endpoint, Sessions.cache.port)
+            )
         except ConnectionRefusedError:
             Sessions.cache = Cache(Cache.MEMORY)
+            Sessions.redis = None
             logger.warning(
                 "Memory cache being used, use redis for production."
             )
 
+        if self.websocket_settings.client_manager:
+            use_manager(self.websocket_settings.client_manager)
+        elif Sessions.redis:
+            # Emits reach sockets connected to other workers.
+            use_manager(MeteredRedisManager(
+                "redis://{}:{}/0".format(
+                    Sessions.cache.endpoint, Sessions.cache.port
+                ),
+                channel=self.websocket_settings.channel
+            ))
+
         if self.clear_cache:
             await Sessions.cache.clear()
 
@@ -316,9 +386,14 @@ class SQLMatches(Starlette):
             await self.b2.authorize()
 
         self.background_tasks = await create_scheduler()
+        Sessions.scheduler = self.background_tasks
         for to_spawn in TASKS_TO_SPAWN:
             await self.background_tasks.spawn(to_spawn())
 
+        if Sessions.redis:
+            await self.background_tasks.spawn(cache_invalidator())
+            await self.background_tasks.spawn(metrics_reporter())
+
         await cache_community_types(self.community_types)
 
     async def _shutdown(self) -> None:
@@ -330,6 +405,10 @@ class SQLMatches(Starlette):
         await Sessions.aiohttp.close()
         await Sessions.cache.close()
 
+        if Sessions.redis:
+            Sessions.redis.close()
+            await Sessions.redis.wait_closed()
+
         if Config.upload_type == B2UploadSettings:
             await self.b2.close()
 
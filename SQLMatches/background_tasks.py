@@ -22,14 +22,24 @@ DEALINGS IN THE SOFTWARE.
 
 from asyncio import sleep
 import logging
+import aioredis
 from sqlalchemy.sql import select, and_, or_, func, text
 from datetime import datetime
 
 from .demos import Demo
 from .resources import DemoQueue, Sessions, Config
 from .tables import scoreboard_total_table
-from .caches import CommunityCache
+from .caches import (
+    CacheBase,
+    CommunityCache,
+    ListingsCache,
+    INVALIDATION_CHANNEL,
+    handle_invalidation
+)
 from .community.match import Match
+from .exceptions import InvalidMatchID
+from .cache_control import purge, match_key
+from .broadcast import report_metrics, METRICS_INTERVAL
 
 
 async def demo_delete() -> None:
@@ -78,6 +88,12 @@ async def expired_demos() -> None:
 
         statements = []
         statements_append = statements.append
+
+        scoreboards = []
+        scoreboards_append = scoreboards.append
+
+        purged = []
+        purged_append = purged.append
         async for match in Sessions.database.iterate(query):
             logging.info("Attempting to delete demo of {}".format(
                 match["match_id"]
@@ -98,9 +114,11 @@ async def expired_demos() -> None:
                 )
             )
 
-            await (CommunityCache(
-                match["community_name"]
-            ).scoreboard(match["match_id"])).expire()
+            cache = CommunityCache(match["community_name"])
+            scoreboards_append(cache.scoreboard(match["match_id"]))
+            scoreboards_append(cache.scoreboard_version(match["match_id"]))
+
+            purged_append(match_key(match["match_id"]))
 
         if statements:
             await Sessions.database.execute(
@@ -113,6 +131,9 @@ async def expired_demos() -> None:
                 )
             )
 
+            await CacheBase.multi_expire(scoreboards)
+            await purge(*purged)
+
         await sleep(43200.0)
 
 
@@ -136,37 +157,113 @@ async def match_ender() -> None:
             )
         )
 
-        statements = []
-        statements_append = statements.append
-        async for match in Sessions.database.iterate(query):
-            logging.info("Attempting to end match {}".format(
-                match["match_id"]
-            ))
+        live = [
+            (match["match_id"], match["community_name"])
+            async for match in Sessions.database.iterate(query)
+        ]
 
-            statements_append(
-                and_(
-                    scoreboard_total_table.c.match_id == match["match_id"],
-                    scoreboard_total_table.c.community_name ==
-                    match["community_name"]
-                )
+        ended = []
+        ended_append = ended.append
+
+        scoreboards = []
+        scoreboards_append = scoreboards.append
+        for match_id, community_name in live:
+            logging.info("Attempting to end match {}".format(match_id))
+
+            try:
+                # False if a end request got to it first.
+                if not await Match(match_id, community_name).end():
+                    continue
+            except InvalidMatchID:
+                continue
+
+            ended_append((match_id, community_name))
+
+            cache = CommunityCache(community_name)
+            scoreboards_append(cache.scoreboard(match_id))
+            scoreboards_append(cache.scoreboard_version(match_id))
+
+        if ended:
+            await CacheBase.multi_expire(scoreboards)
+            await CacheBase.multi_set([
+                (CommunityCache(community_name).finished(match_id), 1)
+                for match_id, community_name in ended
+            ])
+            await purge(*[match_key(match_id) for match_id, _ in ended])
+
+            await CacheBase.multi_invalidate([ListingsCache()] + [
+                ListingsCache(community_name)
+                for community_name in set(community for _, community in ended)
+            ])
+
+        await sleep(400.0)
+
+
+async def cache_invalidator(backoff: float = 1.0,
+                            max_backoff: float = 30.0) -> None:
+    """Drops local cache entries other workers have invalidated,
+    only spawned when redis is used.
+
+    Parameters
+    ----------
+    backoff : float, optional
+        Seconds to wait before the first reconnect, by default 1.0
+    max_backoff : float, optional
+        Most seconds to wait between reconnects, by default 30.0
+    """
+
+    delay = backoff
+    while True:
+        try:
+            subscriber = await aioredis.create_redis(
+                (Sessions.cache.endpoint, Sessions.cache.port)
             )
+        except (OSError, aioredis.RedisError) as error:
+            logging.warning(
+                "Cache invalidation subscriber failed to connect "
+                "because of\n{}".format(error)
+            )
+        else:
+            try:
+                channel, = await subscriber.subscribe(INVALIDATION_CHANNEL)
 
-            await (CommunityCache(
-                match["community_name"]
-            ).scoreboard(match["match_id"])).expire()
+                # Invalidations sent while disconnected were missed.
+                Sessions.local_cache.clear()
+                delay = backoff
 
-        if statements:
-            await Sessions.database.execute(
-                scoreboard_total_table.update().values(
-                    status=0
-                ).where(
-                    or_(
-                        *statements
-                    )
+                async for message in channel.iter(encoding="utf-8"):
+                    handle_invalidation(message)
+
+                logging.warning("Cache invalidation subscriber disconnected")
+            except (OSError, aioredis.RedisError) as error:
+                logging.warning(
+                    "Cache invalidation subscriber failed because of\n{}"
+                    .format(error)
+                )
+            finally:
+                subscriber.close()
+                await subscriber.wait_closed()
+
+        await sleep(delay)
+        delay = min(delay * 2, max_backoff)
+
+
+async def metrics_reporter() -> None:
+    """Shares websocket metrics for the admin API,
+    only spawned when redis is used.
+    """
+
+    while True:
+        try:
+            await report_metrics()
+        except (OSError, aioredis.RedisError) as error:
+            logging.warning(
+                "Reporting websocket metrics failed because of\n{}".format(
+                    error
                 )
             )
 
-        await sleep(400.0)
+        await sleep(METRICS_INTERVAL)
 
 
 TASKS_TO_SPAWN = [
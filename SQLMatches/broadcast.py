@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import asyncio
+import socketio
+import orjson
+
+from time import time
+from typing import AsyncIterator, Dict
+
+from .resources import Sessions, Config
+from .caches import CommunityCache, WORKER_ID
+from .responses import dumps, encode, server_sent_event
+from .websocket_server import EventListener, WebsocketMetrics
+from .community import Community
+from .exceptions import InvalidMatchID
+
+
+# Every match & community created.
+GLOBAL_ROOM = "global"
+# Rooms a socket can be in at once.
+MAX_SUBSCRIPTIONS = 32
+# Seconds between comments sent to idle event streams.
+KEEP_ALIVE = 15.0
+
+TEAMS = ("team_1", "team_2")
+
+# Hash of each worker's websocket metrics, when redis is used.
+METRICS_KEY = "sqlmatches-websocket-metrics"
+# Seconds between workers sharing their websocket metrics,
+# workers not heard from in 3 are left out.
+METRICS_INTERVAL = 10.0
+
+# Match ID, update waiting on Config.emit_window
+_pending: Dict[str, "_PendingUpdate"] = {}
+
+
+def use_manager(manager: socketio.AsyncManager) -> None:
+    """Swaps the client manager of Sessions.websocket,
+    must be called before any socket connects.
+
+    Parameters
+    ----------
+    manager : socketio.AsyncManager
+    """
+
+    manager.set_server(Sessions.websocket)
+    Sessions.websocket.manager = manager
+    Sessions.websocket.manager_initialized = False
+
+
+async def report_metrics() -> None:
+    """Shares the websocket metrics of this worker with the others.
+    """
+
+    await Sessions.redis.hset(METRICS_KEY, WORKER_ID, dumps({
+        "reported": time(),
+        "counts": Sessions.websocket.metrics.counts
+    }))
+
+
+async def cluster_metrics() -> dict:
+    """Websocket metrics of every worker by worker ID
+    & their total.
+
+    Returns
+    -------
+    dict
+    """
+
+    workers = {}
+    if Sessions.redis:
+        stale = []
+
+        reported = await Sessions.redis.hgetall(
+            METRICS_KEY, encoding="utf-8"
+        )
+        for worker_id, value in reported.items():
+            value = orjson.loads(value)
+
+            if value["reported"] < time() - METRICS_INTERVAL * 3:
+                stale.append(worker_id)
+            else:
+                workers[worker_id] = value["counts"]
+
+        if stale:
+            await Sessions.redis.hdel(METRICS_KEY, *stale)
+
+    # Freshest for this worker.
+    workers[WORKER_ID] = Sessions.websocket.metrics.counts
+
+    total = WebsocketMetrics()
+    schemas = {}
+    for worker_id, counts in workers.items():
+        total.merge(counts)
+
+        metrics = WebsocketMetrics()
+        metrics.merge(counts)
+        schemas[worker_id] = metrics.api_schema
+
+    return {"total": total.api_schema, "workers": schemas}
+
+
+def match_room(match_id: str) -> str:
+    return "match:" + match_id
+
+
+def community_room(community_name: str) -> str:
+    return "community:" + community_name
+
+
+def scoreboard_patch(old: dict, new: dict) -> dict:
+    """Fields of a scoreboard what changed.
+
+    Parameters
+    ----------
+    old : dict
+    new : dict
+
+    Returns
+    -------
+    dict
+        "match" holds changed match fields, "players" changed
+        fields by steam ID & "removed" steam IDs no longer playing.
+    """
+
+    old_players = {
+        player["steam_id"]: player
+        for team in TEAMS for player in old[team]
+    }
+
+    players = {}
+    for team in TEAMS:
+        for player in new[team]:
+            previous = old_players.pop(player["steam_id"], None)
+            if previous is None:
+                players[player["steam_id"]] = player
+                continue
+
+            changed = {
+                field: value for field, value in player.items()
+                if previous.get(field) != value
+            }
+            if changed:
+                players[player["steam_id"]] = changed
+
+    return {
+        "match": {
+            field: value for field, value in new.items()
+            if field not in TEAMS and old.get(field) != value
+        },
+        "players": players,
+        "removed": list(old_players)
+    }
+
+
+async def snapshot(community_name: str, match_id: str) -> dict:
+    """Scoreboard & the version it's at.
+
+    Parameters
+    ----------
+    community_name : str
+    match_id : str
+
+    Returns
+    -------
+    dict
+        None if match doesn't exist.
+    """
+
+    cache = CommunityCache(community_name)
+
+    missing = cache.missing_match(match_id)
+    if await missing.missed():
+        return None
+
+    # Read first, so the scoreboard is never older than the version.
+    version = await (cache.scoreboard_version(match_id)).value()
+
+    async def compute() -> bytes:
+        return encode((
+            await Community(community_name).match(match_id).scoreboard()
+        ).api_schema)
+
+    try:
+        body = await (cache.scoreboard(match_id)).get_or_compute(
+            compute, lock=True
+        )
+    except InvalidMatchID:
+        await missing.miss()
+        return None
+
+    return {
+        "match_id": match_id,
+        "version": version,
+        "scoreboard": orjson.loads(body)["data"]
+    }
+
+
+async def send_snapshot(sid: str, community_name: str,
+                        match_id: str) -> bool:
+    """Sends a scoreboard snapshot to one socket.
+
+    Parameters
+    ----------
+    sid : str
+    community_name : str
+    match_id : str
+
+    Returns
+    -------
+    bool
+        False if match doesn't exist.
+    """
+
+    data = await snapshot(community_name, match_id)
+    if data is None:
+        return False
+
+    await Sessions.websocket.emit("scoreboard_snapshot", data, room=sid)
+
+    return True
+
+
+async def match_events(listener: EventListener,
+                       data: dict) -> AsyncIterator[bytes]:
+    """Server-sent events of a match, starting with its snapshot.
+
+    Parameters
+    ----------
+    listener : EventListener
+        Listening to the match's room, stopped once done.
+    data : dict
+        From snapshot.
+
+    Yields
+    ------
+    bytes
+    """
+
+    try:
+        yield server_sent_event("scoreboard_snapshot", data)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    listener.queue.get(), KEEP_ALIVE
+                )
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+
+            # Closed for falling behind.
+            if event is None:
+                break
+
+            if event.encoded is None:
+                event.encoded = server_sent_event(event.event, event.data)
+
+            yield event.encoded
+    finally:
+        Sessions.websocket.stop_listening(listener)
+
+
+class _PendingUpdate:
+    __slots__ = ("community_name", "data", "version")
+
+    def __init__(self, community_name: str, data: dict,
+                 version: int) -> None:
+        self.community_name = community_name
+        self.data = data
+        self.version = version
+
+
+async def match_update(community_name: str, match_id: str,
+                       data: dict, version: int) -> None:
+    """Sends what changed of a scoreboard since the last sent by
+    any worker to sockets watching the match, a snapshot if none
+    was. Sockets watching its community or the global feed get
+    the match without players.
+
+    Updates within Config.emit_window of the first are coalesced,
+    only the latest is sent. Updates no newer than one pending or
+    already sent are dropped, requests can finish out of order.
+
+    Parameters
+    ----------
+    community_name : str
+    match_id : str
+    data : dict
+        Scoreboard of the match.
+    version : int
+        From the match's scoreboard_version.
+    """
+
+    pending = _pending.get(match_id)
+    if pending:
+        if version > pending.version:
+            pending.data = data
+            pending.version = version
+        return
+
+    _pending[match_id] = _PendingUpdate(community_name, data, version)
+
+    if Config.emit_window > 0:
+        await Sessions.scheduler.spawn(_emit_later(match_id))
+    else:
+        await _emit(match_id)
+
+
+async def _emit_later(match_id: str) -> None:
+    await asyncio.sleep(Config.emit_window)
+    await _emit(match_id)
+
+
+async def _emit(match_id: str) -> None:
+    pending = _pending.pop(match_id)
+
+    # Shared, as consecutive versions rarely land on one worker.
+    # Locked so workers compare against & store the latest in turn.
+    sent = CommunityCache(pending.community_name).sent_scoreboard(match_id)
+    async with sent.lock():
+        previous = await sent.get()
+        if previous and previous["version"] >= pending.version:
+            return
+
+        # As it's sent & stored, so timestamps compare equal.
+        data = orjson.loads(dumps(pending.data))
+
+        if pending.data["status"] != 0:
+            await sent.set(
+                {"version": pending.version, "scoreboard": data},
+                ttl=Config.cache_hard_ttl
+            )
+        else:
+            await sent.expire()
+
+        # Sockets not at base resync, so a patch onto any
+        # earlier version sent is safe.
+        if previous:
+            await Sessions.websocket.emit(
+                "scoreboard_patch",
+                {
+                    "match_id": match_id,
+                    "base": previous["version"],
+                    "version": pending.version,
+                    **scoreboard_patch(previous["scoreboard"], data)
+                },
+                room=match_room(match_id)
+            )
+        else:
+            await Sessions.websocket.emit(
+                "scoreboard_snapshot",
+                {
+                    "match_id": match_id,
+                    "version": pending.version,
+                    "scoreboard": data
+                },
+                room=match_room(match_id)
+            )
+
+    match = {
+        field: value for field, value in pending.data.items()
+        if field not in TEAMS
+    }
+
+    await Sessions.websocket.emit(
+        "match_update", match, room=community_room(pending.community_name)
+    )
+    await Sessions.websocket.emit("match_update", match, room=GLOBAL_ROOM)
+
+
+async def server_update(community_name: str, data: dict) -> None:
+    """Sends a server change to sockets watching the community.
+
+    Parameters
+    ----------
+    community_name : str
+    data : dict
+    """
+
+    await Sessions.websocket.emit(
+        community_name, data, room=community_room(community_name)
+    )
+
+
+async def community_update(data: dict) -> None:
+    """Sends a new community to sockets watching the global feed.
+
+    Parameters
+    ----------
+    data : dict
+    """
+
+    await Sessions.websocket.emit(
+        "community_updates", data, room=GLOBAL_ROOM
+    )
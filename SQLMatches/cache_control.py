@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import logging
+
+from asyncio import TimeoutError
+from typing import List
+from aiohttp import ClientError
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+from .resources import Sessions, Config
+
+
+def match_key(match_id: str) -> str:
+    return "match-" + match_id
+
+
+def community_key(community_name: str) -> str:
+    return "community-" + community_name
+
+
+VERSIONS_KEY = "versions"
+MAPS_KEY = "maps"
+
+
+def cache_control(resp: Response, max_age: int = 0,
+                  public: bool = False, keys: List[str] = None
+                  ) -> Response:
+    """Sets Cache-Control & Surrogate-Key headers on a response.
+
+    Parameters
+    ----------
+    resp : Response
+    max_age : int, optional
+        Seconds browsers can reuse the response, 0 makes
+        them revalidate every time, by default 0
+    public : bool, optional
+        Lets shared caches hold the response for
+        Config.shared_max_age, only for responses what
+        don't need auth, by default False
+    keys : List[str], optional
+        Surrogate keys purge can drop the response by,
+        by default None
+
+    Returns
+    -------
+    Response
+    """
+
+    if not max_age:
+        resp.headers["Cache-Control"] = "no-cache"
+    elif public:
+        resp.headers["Cache-Control"] = (
+            "public, max-age={}, s-maxage={}".format(
+                max_age, Config.shared_max_age
+            )
+        )
+    else:
+        resp.headers["Cache-Control"] = "private, max-age={}".format(
+            max_age
+        )
+
+    if keys:
+        resp.headers["Surrogate-Key"] = " ".join(keys)
+
+    return resp
+
+
+async def __purge(keys: List[str]) -> None:
+    try:
+        async with Sessions.aiohttp.request(
+                "PURGE",
+                Config.purge_url,
+                timeout=Config.webhook_timeout,
+                headers={"Surrogate-Key": " ".join(keys)}) as resp:
+            if resp.status >= 400:
+                logging.warning("Purging {} failed with status {}".format(
+                    keys, resp.status
+                ))
+    except (ClientError, TimeoutError) as error:
+        logging.warning("Purging {} failed because of\n{}".format(
+            keys, error
+        ))
+
+
+async def purge(*keys: str) -> None:
+    """Tells the CDN or nginx at Config.purge_url to drop responses
+    tagged with keys, sent in the background.
+
+    Parameters
+    ----------
+    keys : str
+    """
+
+    if Config.purge_url and keys:
+        await Sessions.scheduler.spawn(__purge(list(keys)))
+
+
+class MapStaticFiles(StaticFiles):
+    """Map images, shared caches can hold them.
+    """
+
+    def file_response(self, *args, **kwargs) -> Response:
+        return cache_control(
+            super().file_response(*args, **kwargs),
+            Config.browser_max_age,
+            public=True,
+            keys=[MAPS_KEY]
+        )
@@ -21,54 +21,948 @@ DEALINGS IN THE SOFTWARE.
 """
 
 
-from typing import Any
-from .resources import Sessions
+import asyncio
+import json
+
+from hashlib import sha256
+
+from collections import OrderedDict
+from inspect import signature
+from time import monotonic, time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+import orjson
+
+from aiocache.serializers import BaseSerializer
+from starlette.responses import Response
+
+from .resources import Sessions, Config
+from .responses import encode, encoded_response, dumps
+from .compression import PrecompressedResponse
+
+
+INVALIDATION_CHANNEL = "sqlmatches-cache-invalidation"
+WORKER_ID = uuid4().hex
+
+# Keys currently being computed by this worker.
+IN_FLIGHT: Dict[str, asyncio.Future] = {}
+
+# Marks a value stored with a soft TTL.
+SOFT_EXPIRES = "__soft_expires"
+
+# Max keys sent to redis in one DEL.
+DELETE_CHUNK = 1000
+
+
+class ORJSONSerializer(BaseSerializer):
+    """Stores values how responses encode them,
+    used for redis.
+    """
+
+    def dumps(self, value: Any) -> str:
+        return dumps(value).decode()
+
+    def loads(self, value: Any) -> Any:
+        if value is None:
+            return None
+
+        return orjson.loads(value)
+
+
+class LocalCache:
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """In-process LRU cache, sits in front of Sessions.cache.
+
+        Parameters
+        ----------
+        max_size : int
+            Max amount of entries to hold.
+        ttl : float
+            Seconds to hold a entry for.
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.__entries = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Used to get a entry.
+
+        Returns
+        -------
+        bool
+            If entry found.
+        Any
+        """
+
+        entry = self.__entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires, value = entry
+        if expires < monotonic():
+            del self.__entries[key]
+            return False, None
+
+        self.__entries.move_to_end(key)
+
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        self.__entries[key] = (
+            monotonic() + (min(ttl, self.ttl) if ttl else self.ttl),
+            value
+        )
+        self.__entries.move_to_end(key)
+
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+
+async def delete_many(keys: List[str]) -> None:
+    """Deletes keys in one round trip per chunk on redis,
+    the memory backend has no round trips to save.
+
+    Parameters
+    ----------
+    keys : List[str]
+    """
+
+    if not keys:
+        return
+
+    Sessions.local_cache.delete(*keys)
+
+    if Sessions.redis:
+        for index in range(0, len(keys), DELETE_CHUNK):
+            await Sessions.redis.delete(*keys[index:index + DELETE_CHUNK])
+    else:
+        for key in keys:
+            await Sessions.cache.delete(key)
+
+    await publish_invalidation(*keys)
+
+
+async def publish_invalidation(*keys: str) -> None:
+    """Tells other workers to drop their local copies of keys.
+
+    Parameters
+    ----------
+    keys : str
+    """
+
+    if Sessions.redis:
+        await Sessions.redis.publish(
+            INVALIDATION_CHANNEL,
+            json.dumps([WORKER_ID, keys])
+        )
+
+
+def handle_invalidation(message: str) -> None:
+    """Drops local copies of keys invalidated by another worker.
+
+    Parameters
+    ----------
+    message : str
+        Message published by publish_invalidation.
+    """
+
+    worker_id, keys = json.loads(message)
+    if worker_id != WORKER_ID:
+        Sessions.local_cache.delete(*keys)
+
+
+def _load_counter(value: Any) -> int:
+    return int(value) if value is not None else None
+
+
+async def counter(key: str, create: bool = True, ttl=None) -> int:
+    """Gets a counter, missing counters start from the time in ms
+    so a flushed cache never hands out a old value again.
+
+    Parameters
+    ----------
+    key : str
+    create : bool, optional
+        Start the counter if missing, by default True
+    ttl : optional
+        TTL of a started counter, by default None
+
+    Returns
+    -------
+    int
+        None if missing & not created.
+    """
+
+    found, value = Sessions.local_cache.get(key)
+    if found:
+        return value
+
+    value = await Sessions.cache.get(key, loads_fn=_load_counter)
+    if value is None:
+        if not create:
+            return None
+
+        value = int(time() * 1000)
+        try:
+            await Sessions.cache.add(key, value, ttl=ttl)
+        except ValueError:
+            value = await Sessions.cache.get(key, loads_fn=_load_counter)
+
+    Sessions.local_cache.set(key, value)
+
+    return value
+
+
+async def generation(namespace: str) -> int:
+    """Gets the current generation of a namespace.
+
+    Parameters
+    ----------
+    namespace : str
+
+    Returns
+    -------
+    int
+    """
+
+    return await counter(namespace + "-generation")
+
+
+class CacheLock:
+    def __init__(self, cache: "CacheBase", timeout: int) -> None:
+        """Held by one worker at a time, taken with add so it
+        frees itself after timeout if the holder dies.
+
+        Parameters
+        ----------
+        cache : CacheBase
+            Value the lock guards.
+        timeout : int
+            Seconds the lock is held for at most.
+        """
+
+        self.cache = cache
+        self.timeout = timeout
+
+        self.__key = None
+
+    async def __aenter__(self) -> "CacheLock":
+        self.__key = await self.cache.resolve() + "-lock"
+
+        while True:
+            try:
+                await Sessions.cache.add(
+                    self.__key, WORKER_ID, ttl=self.timeout
+                )
+            except ValueError:
+                await asyncio.sleep(0.01)
+            else:
+                return self
+
+    async def __aexit__(self, *args) -> None:
+        await Sessions.cache.delete(self.__key)
 
 
 class CacheBase:
-    def __init__(self, key: str) -> None:
+    # Overrides the serializer of Sessions.cache if set.
+    _dumps: Callable[[Any], Any] = None
+    _loads: Callable[[Any], Any] = None
+    # Applied to values passed to set if set.
+    _encode: Callable[[Any], Any] = None
+    # Values are also held in Sessions.local_cache if set.
+    _local: bool = True
+
+    def __init__(self, key: str, namespace: str = None) -> None:
+        """Used to interact with a cached value.
+
+        Parameters
+        ----------
+        key : str
+        namespace : str, optional
+            Namespace the key is versioned under, by default None
+        """
+
         self.key = key
+        self.namespace = namespace
+
+    async def resolve(self) -> str:
+        """Key with the generation of its namespace baked in.
+
+        Returns
+        -------
+        str
+        """
+
+        if not self.namespace:
+            return self.key
+
+        return "{}:{}:{}".format(
+            self.namespace,
+            await generation(self.namespace),
+            self.key
+        )
+
+    async def invalidate(self) -> None:
+        """Invalidates every key under the namespace at once,
+        old keys are left to expire from redis & the local LRU,
+        see hard_ttl.
+        """
+
+        key = self.namespace + "-generation"
+
+        await counter(key)
+        await Sessions.cache.increment(key)
+        Sessions.local_cache.delete(key)
+        await publish_invalidation(key)
+
+    def hard_ttl(self, ttl=None) -> Any:
+        """Keys under a namespace default to Config.cache_hard_ttl,
+        nothing deletes them once their generation is invalidated.
+
+        Parameters
+        ----------
+        ttl : optional
+            by default None
+
+        Returns
+        -------
+        Any
+        """
+
+        if ttl is None and self.namespace:
+            return Config.cache_hard_ttl
+
+        return ttl
 
     async def expire(self) -> None:
-        await Sessions.cache.delete(self.key)
+        key = await self.resolve()
+
+        Sessions.local_cache.delete(key)
+        await Sessions.cache.delete(key)
+        await publish_invalidation(key)
+
+    async def set(self, value: Any, ttl=None, soft_ttl: float = None
+                  ) -> None:
+        """Used to set the value.
 
-    async def set(self, value: Any, ttl=None) -> None:
-        await Sessions.cache.set(self.key, value, ttl=ttl)
+        Parameters
+        ----------
+        value : Any
+        ttl : optional
+            Hard TTL, by default None
+        soft_ttl : float, optional
+            Seconds until readers of get_or_compute refresh
+            the value in the background, by default None
+        """
+
+        if self._encode:
+            value = self._encode(value)
+
+        await self.__set(
+            await self.resolve(), self.__wrap(value, soft_ttl), ttl
+        )
 
     async def get(self) -> Any:
-        return await Sessions.cache.get(self.key)
+        value, _ = self.__unwrap(await self.__get(await self.resolve()))
+        return value
+
+    def lock(self, timeout: int = 5) -> CacheLock:
+        """Used to read & set the value without other workers
+        doing the same in between.
+
+        Parameters
+        ----------
+        timeout : int, optional
+            Seconds the lock is held for at most, by default 5
+
+        Returns
+        -------
+        CacheLock
+        """
+
+        return CacheLock(self, timeout)
+
+    async def stale(self, ttl=None) -> None:
+        """Marks a value stored with a soft TTL as stale, the next
+        reader gets it while it's refreshed. Other values are expired.
+
+        Parameters
+        ----------
+        ttl : optional
+            Hard TTL, by default None
+        """
+
+        key = await self.resolve()
+
+        value, soft_expires = self.__unwrap(await self.__get(key))
+        if soft_expires is not None:
+            await self.__set(key, {SOFT_EXPIRES: 0, "value": value}, ttl)
+        elif value is not None:
+            await self.expire()
+
+    @staticmethod
+    async def multi_get(caches: List["CacheBase"]) -> List[Any]:
+        """Gets many values, misses of the local tier are
+        fetched in one MGET.
+
+        Parameters
+        ----------
+        caches : List[CacheBase]
+
+        Returns
+        -------
+        List[Any]
+            In the order of caches, None for misses.
+        """
+
+        keys = [await cache.resolve() for cache in caches]
+        values = [None] * len(keys)
+
+        missing = []
+        for index, key in enumerate(keys):
+            found, value = (
+                Sessions.local_cache.get(key) if caches[index]._local
+                else (False, None)
+            )
+            if found:
+                values[index] = value
+            else:
+                missing.append(index)
+
+        if missing:
+            fetched = await Sessions.cache.multi_get(
+                [keys[index] for index in missing],
+                # Loaded per cache below.
+                loads_fn=lambda value: value
+            )
+
+            for index, value in zip(missing, fetched):
+                if value is None:
+                    continue
+
+                value = (
+                    caches[index]._loads or Sessions.cache.serializer.loads
+                )(value)
+
+                if caches[index]._local:
+                    Sessions.local_cache.set(keys[index], value)
+                values[index] = value
+
+        return [CacheBase.__unwrap(value)[0] for value in values]
+
+    @staticmethod
+    async def multi_set(pairs: List[Tuple["CacheBase", Any]], ttl=None
+                        ) -> None:
+        """Sets many values in one MSET.
+
+        Parameters
+        ----------
+        pairs : List[Tuple[CacheBase, Any]]
+        ttl : optional
+            by default None
+        """
+
+        if not pairs:
+            return
+
+        if ttl is None and any(cache.namespace for cache, _ in pairs):
+            ttl = Config.cache_hard_ttl
+
+        keys = []
+        dumped = []
+        for cache, value in pairs:
+            key = await cache.resolve()
+            if cache._encode:
+                value = cache._encode(value)
+
+            if cache._local:
+                Sessions.local_cache.set(key, value, ttl)
+
+            keys.append(key)
+            dumped.append((
+                key,
+                (cache._dumps or Sessions.cache.serializer.dumps)(value)
+            ))
+
+        await Sessions.cache.multi_set(
+            dumped, ttl=ttl, dumps_fn=lambda value: value
+        )
+        await publish_invalidation(*keys)
+
+    @staticmethod
+    async def multi_expire(caches: List["CacheBase"]) -> None:
+        """Expires many values in one DEL.
+
+        Parameters
+        ----------
+        caches : List[CacheBase]
+        """
+
+        await delete_many([await cache.resolve() for cache in caches])
+
+    @staticmethod
+    async def multi_invalidate(caches: List["CacheBase"]) -> None:
+        """Invalidates many namespaces in one pipeline.
+
+        Parameters
+        ----------
+        caches : List[CacheBase]
+        """
+
+        keys = list({cache.namespace + "-generation" for cache in caches})
+        if not keys:
+            return
+
+        if Sessions.redis:
+            # Seeded like counter does, so a evicted generation
+            # doesn't restart onto keys earlier generations used.
+            started = int(time() * 1000)
+
+            pipeline = Sessions.redis.pipeline()
+            for key in keys:
+                pipeline.setnx(key, started)
+                pipeline.incr(key)
+            await pipeline.execute()
+        else:
+            for key in keys:
+                await counter(key)
+                await Sessions.cache.increment(key)
+
+        Sessions.local_cache.delete(*keys)
+        await publish_invalidation(*keys)
+
+    @staticmethod
+    def __wrap(value: Any, soft_ttl: float = None) -> Any:
+        if soft_ttl is None:
+            return value
+
+        return {SOFT_EXPIRES: time() + soft_ttl, "value": value}
+
+    @staticmethod
+    def __unwrap(value: Any) -> Tuple[Any, float]:
+        if isinstance(value, dict) and SOFT_EXPIRES in value:
+            return value["value"], value[SOFT_EXPIRES]
+
+        return value, None
+
+    async def __get(self, key: str) -> Any:
+        if not self._local:
+            return await Sessions.cache.get(key, loads_fn=self._loads)
+
+        found, value = Sessions.local_cache.get(key)
+        if found:
+            return value
+
+        value = await Sessions.cache.get(key, loads_fn=self._loads)
+        if value is not None:
+            Sessions.local_cache.set(key, value)
+
+        return value
+
+    async def __set(self, key: str, value: Any, ttl=None) -> None:
+        ttl = self.hard_ttl(ttl)
+
+        await Sessions.cache.set(key, value, ttl=ttl, dumps_fn=self._dumps)
+
+        if self._local:
+            Sessions.local_cache.set(key, value, ttl)
+            await publish_invalidation(key)
+
+    async def get_or_compute(self, compute: Callable[[], Awaitable[Any]],
+                             ttl=None, soft_ttl: float = None,
+                             lock: bool = False,
+                             lock_timeout: int = 5) -> Any:
+        """Gets the value, on a miss only one coroutine per key
+        computes it while the others wait for its result.
+
+        Parameters
+        ----------
+        compute : Callable[[], Awaitable[Any]]
+            Called to get the value on a miss.
+        ttl : optional
+            Hard TTL, by default None
+        soft_ttl : float, optional
+            Seconds until the value is stale, stale values are still
+            returned while they're refreshed on Sessions.scheduler,
+            by default None
+        lock : bool, optional
+            Also coalesce across workers using a lock
+            in Sessions.cache, by default False
+        lock_timeout : int, optional
+            Seconds to wait on another worker, by default 5
+
+        Returns
+        -------
+        Any
+        """
+
+        key = await self.resolve()
+
+        value, soft_expires = self.__unwrap(await self.__get(key))
+        if value is not None:
+            if (soft_expires is not None and soft_expires <= time()
+                    and key not in IN_FLIGHT):
+                await Sessions.scheduler.spawn(self.__compute(
+                    key, compute, ttl, soft_ttl, lock, lock_timeout
+                ))
+
+            return value
+
+        if key in IN_FLIGHT:
+            return await asyncio.shield(IN_FLIGHT[key])
+
+        return await self.__compute(
+            key, compute, ttl, soft_ttl, lock, lock_timeout
+        )
+
+    async def __compute(self, key: str,
+                        compute: Callable[[], Awaitable[Any]],
+                        ttl, soft_ttl: float, lock: bool,
+                        lock_timeout: int) -> Any:
+        # Ran as its own task, so a client disconnecting doesn't
+        # cancel the compute other coroutines are waiting on.
+        if lock:
+            task = asyncio.ensure_future(self.__locked_compute(
+                key, compute, ttl, soft_ttl, lock_timeout
+            ))
+        else:
+            task = asyncio.ensure_future(self.__unlocked_compute(
+                key, compute, ttl, soft_ttl
+            ))
+
+        IN_FLIGHT[key] = task
+
+        def done(task: asyncio.Future) -> None:
+            if IN_FLIGHT.get(key) is task:
+                del IN_FLIGHT[key]
+
+            # Stops asyncio complaining if no one was waiting.
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(done)
+
+        return await asyncio.shield(task)
+
+    async def __unlocked_compute(self, key: str,
+                                 compute: Callable[[], Awaitable[Any]],
+                                 ttl, soft_ttl: float) -> Any:
+        value = await compute()
+        await self.__set(key, self.__wrap(value, soft_ttl), ttl)
+
+        return value
+
+    async def __fresh(self, key: str) -> Any:
+        value = await Sessions.cache.get(key, loads_fn=self._loads)
+        if value is None:
+            return None
+
+        Sessions.local_cache.set(key, value)
+
+        value, soft_expires = self.__unwrap(value)
+        if soft_expires is None or soft_expires > time():
+            return value
+
+        return None
+
+    async def __locked_compute(self, key: str,
+                               compute: Callable[[], Awaitable[Any]],
+                               ttl, soft_ttl: float,
+                               lock_timeout: int) -> Any:
+        lock_key = key + "-lock"
+        deadline = monotonic() + lock_timeout
+
+        while True:
+            try:
+                await Sessions.cache.add(
+                    lock_key, WORKER_ID, ttl=lock_timeout
+                )
+            except ValueError:
+                pass
+            else:
+                try:
+                    return await self.__unlocked_compute(
+                        key, compute, ttl, soft_ttl
+                    )
+                finally:
+                    await Sessions.cache.delete(lock_key)
+
+            # Another worker is computing, wait for it to set the value
+            # or to let go of the lock without one.
+            while await Sessions.cache.exists(lock_key):
+                if monotonic() >= deadline:
+                    return await self.__unlocked_compute(
+                        key, compute, ttl, soft_ttl
+                    )
+
+                await asyncio.sleep(0.05)
+
+                value = await self.__fresh(key)
+                if value is not None:
+                    return value
+
+            # Set just before the lock was deleted, else it failed
+            # & the lock is tried again.
+            value = await self.__fresh(key)
+            if value is not None:
+                return value
+
+
+class SharedCache(CacheBase):
+    """Only held in Sessions.cache, so what one worker sets
+    under lock the next reads.
+    """
+
+    _local = False
+
+
+class ResponseCache(CacheBase):
+    """Holds encoded response bodies, so a hit is sent
+    without any JSON work.
+    """
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        if isinstance(value, dict):
+            return "{}\n{}".format(
+                value[SOFT_EXPIRES], value["value"].decode()
+            )
+
+        return "\n" + value.decode()
+
+    @staticmethod
+    def _loads(value: Any) -> Any:
+        if value is None:
+            return None
+
+        if isinstance(value, bytes):
+            value = value.decode()
+
+        soft_expires, body = value.split("\n", 1)
+        if soft_expires:
+            return {SOFT_EXPIRES: float(soft_expires), "value": body.encode()}
+
+        return body.encode()
+
+    _encode = staticmethod(encode)
+
+    async def response(self, compute: Callable[[], Awaitable[Any]],
+                       **kwargs) -> Response:
+        """Responds with the encoded body, kwargs are passed
+        to get_or_compute.
+
+        Parameters
+        ----------
+        compute : Callable[[], Awaitable[Any]]
+
+        Returns
+        -------
+        Response
+        """
+
+        async def encoded() -> bytes:
+            return encode(await compute())
+
+        return PrecompressedResponse(
+            await self.get_or_compute(encoded, **kwargs), self.key
+        )
+
+
+class FlagCache(CacheBase):
+    """Remembers something is true.
+    """
+
+    async def flagged(self) -> bool:
+        return await self.get() is not None
+
+    async def flag(self, ttl=None) -> None:
+        await self.set(1, ttl=ttl)
+
+
+class MissCache(FlagCache):
+    """Remembers a lookup found nothing, for Config.negative_ttl.
+    """
+
+    async def missed(self) -> bool:
+        return await self.flagged()
+
+    async def miss(self) -> None:
+        await self.flag(Config.negative_ttl)
+
+
+class CounterCache(CacheBase):
+    """Counts changes to a resource, used for ETags. Expiring
+    a counter restarts it from the time.
+    """
+
+    async def value(self, create: bool = True) -> int:
+        return await counter(
+            await self.resolve(), create, Config.cache_hard_ttl
+        )
+
+    async def bump(self) -> int:
+        key = await self.resolve()
+
+        await counter(key, ttl=Config.cache_hard_ttl)
+        value = await Sessions.cache.increment(key)
+
+        Sessions.local_cache.set(key, value)
+        await publish_invalidation(key)
+
+        return value
+
+    async def etag(self, create: bool = True) -> str:
+        value = await self.value(create)
+        return '"{}"'.format(value) if value is not None else None
+
+
+class ListingCache(ResponseCache):
+    def __init__(self, listing: Callable, parameters: dict,
+                 namespace: str) -> None:
+        """Caches a page of a listing, keyed by its normalized arguments.
+
+        Parameters
+        ----------
+        listing : Callable
+            Function what lists, its defaults fill missing arguments.
+        parameters : dict
+            Arguments passed to the listing.
+        namespace : str
+        """
+
+        arguments = {
+            name: parameter.default
+            for name, parameter in signature(listing).parameters.items()
+            if name != "limit"
+        }
+        arguments.update(parameters)
+
+        # Every ordering of the same fields shares one key.
+        for name, value in arguments.items():
+            if isinstance(value, list):
+                arguments[name] = ",".join(sorted(set(value)))
+
+        super().__init__(
+            "{}?{}".format(listing.__qualname__, "&".join(
+                "{}={}".format(name, arguments[name])
+                for name in sorted(arguments)
+            )),
+            namespace
+        )
+
+        # Searches & deep pages aren't cached,
+        # keeps the amount of keys bounded.
+        self.cacheable = (
+            not arguments.get("search")
+            and 1 <= arguments.get("page", 1) <= Config.listing_pages
+        )
+
+    async def etag(self) -> str:
+        """Changes whenever the namespace is invalidated.
+
+        Returns
+        -------
+        str
+        """
+
+        return '"{}-{}"'.format(
+            await generation(self.namespace),
+            sha256(self.key.encode()).hexdigest()[:16]
+        )
+
+    async def response(self, compute: Callable[[], Awaitable[Any]],
+                       **kwargs) -> Response:
+        if not self.cacheable:
+            return encoded_response(encode(await compute()))
+
+        return await super().response(compute, **kwargs)
+
+
+class ListingsCache(CacheBase):
+    def __init__(self, community_name: str = None) -> None:
+        """Listings of a community, or listings across
+        communities if community_name not passed.
+
+        Parameters
+        ----------
+        community_name : str, optional
+            by default None
+        """
+
+        super().__init__(
+            "listings",
+            "listings:" + community_name if community_name else "listings"
+        )
+
+    def listing(self, listing: Callable, parameters: dict) -> ListingCache:
+        return ListingCache(listing, parameters, self.namespace)
+
+    def missing_player(self, steam_id: str) -> MissCache:
+        # Players are added by match writes, what bump this namespace.
+        return MissCache("missing-player-" + steam_id, self.namespace)
 
 
 class __ScoreboardCache:
-    def scoreboard(self, match_id: str) -> CacheBase:
-        return CacheBase(self.key + "-" + match_id)
+    def scoreboard(self, match_id: str) -> ResponseCache:
+        return ResponseCache(self.key + "-" + match_id, self.namespace)
+
+    def scoreboard_version(self, match_id: str) -> CounterCache:
+        return CounterCache(
+            self.key + "-" + match_id + "-version", self.namespace
+        )
+
+    def sent_scoreboard(self, match_id: str) -> SharedCache:
+        """Version & scoreboard last sent to the match's room."""
+
+        return SharedCache(
+            self.key + "-" + match_id + "-sent", self.namespace
+        )
+
+    def finished(self, match_id: str) -> FlagCache:
+        # Finished is terminal, kept outside the generation
+        # so it never expires or is orphaned by invalidation.
+        return FlagCache(self.key + "-" + match_id + "-finished")
+
+    def missing_match(self, match_id: str) -> MissCache:
+        return MissCache(
+            self.key + "-" + match_id + "-missing", self.namespace
+        )
 
 
 class __MatchesCache:
     def matches(self) -> CacheBase:
-        return CacheBase(self.key + "-matches")
+        return CacheBase(self.key + "-matches", self.namespace)
 
 
 class __ProfileCache:
     def profile(self, steam_id: str) -> CacheBase:
-        return CacheBase(self.key + steam_id)
+        return CacheBase(self.key + steam_id, self.namespace)
 
 
-class CommunityCache(CacheBase, __MatchesCache, __ScoreboardCache,
-                     __ProfileCache):
+class CommunityCache(CacheBase, __ScoreboardCache, __ProfileCache):
     def __init__(self, community_name: str) -> None:
-        super().__init__(community_name)
+        super().__init__(community_name, "community:" + community_name)
 
     def stats(self, key: str = "-stats") -> CacheBase:
-        return CacheBase(self.key + key)
+        return CacheBase(self.key + key, self.namespace)
 
     def payments(self, key: str = "-payments") -> CacheBase:
-        return CacheBase(self.key + key)
+        return CacheBase(self.key + key, self.namespace)
 
 
 class CommunitiesCache(CacheBase, __MatchesCache):
     def __init__(self, key: str = "communities") -> None:
-        super().__init__(key)
+        super().__init__(key, "communities")
 
 
 class VersionCache(CacheBase):
@@ -86,6 +980,49 @@ class ServerCache(CacheBase):
         super().__init__("{}-{}".format(ip, port))
 
 
-class ServersCache(CacheBase):
+class ServersCache(ResponseCache):
     def __init__(self, community_name: str) -> None:
-        super().__init__(community_name + "-servers")
+        super().__init__(
+            community_name + "-servers",
+            "community:" + community_name
+        )
+
+        # Sparse listings can't be found to expire one by one,
+        # so they're versioned under their own namespace.
+        self.sparse_namespace = "servers:" + community_name
+
+    async def expire(self) -> None:
+        await super().expire()
+        await CacheBase(self.key, self.sparse_namespace).invalidate()
+
+    async def stale(self, ttl=None) -> None:
+        await super().stale(ttl)
+        await CacheBase(self.key, self.sparse_namespace).invalidate()
+
+    def missing(self, ip: str, port: int) -> MissCache:
+        return MissCache(
+            "{}-{}-{}-missing".format(self.key, ip, port), self.namespace
+        )
+
+    def sparse(self, fields: List[str]) -> ResponseCache:
+        return ResponseCache(
+            "{}?fields={}".format(self.key, ",".join(sorted(set(fields)))),
+            self.sparse_namespace
+        )
+
+
+class ApiKeyCache(CacheBase):
+    def __init__(self, api_key: str) -> None:
+        """Keyed by a hash, so keys aren't stored in the cache.
+
+        Parameters
+        ----------
+        api_key : str
+        """
+
+        super().__init__(
+            "api-key-" + sha256(api_key.encode()).hexdigest()
+        )
+
+    def missing(self) -> MissCache:
+        return MissCache(self.key + "-missing")
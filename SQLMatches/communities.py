@@ -35,7 +35,12 @@ from .tables import (
 
 from .community import Community
 from .community.match import Match
-from .community.models import PublicCommunityModel, MatchModel
+from .community.models import (
+    PublicCommunityModel,
+    MatchModel,
+    SparseModel,
+    sparse_columns
+)
 
 
 async def communities(search: str = None, page: int = 1,
@@ -115,7 +120,8 @@ async def ban_communities(communities: List[str]) -> None:
 
 
 async def matches(search: str = None,
-                  page: int = 1, limit: int = 3, desc: bool = True
+                  page: int = 1, limit: int = 3, desc: bool = True,
+                  fields: List[str] = None
                   ) -> AsyncGenerator[MatchModel, Match]:
     """Lists matches.
 
@@ -126,16 +132,18 @@ async def matches(search: str = None,
     limit: int
     desc: bool, optional
         by default True
+    fields : List[str], optional
+        Only select & serialize these fields, by default None
 
     Yields
     ------
     MatchModel
-        Holds basic match details.
+        Holds basic match details, SparseModel if fields passed.
     Match
         Used for interacting with a match.
     """
 
-    query = select([
+    columns = [
         scoreboard_total_table.c.match_id,
         scoreboard_total_table.c.timestamp,
         scoreboard_total_table.c.status,
@@ -148,7 +156,17 @@ async def matches(search: str = None,
         scoreboard_total_table.c.team_1_side,
         scoreboard_total_table.c.team_2_side,
         scoreboard_total_table.c.community_name
-    ])
+    ]
+
+    if fields:
+        # Timestamp is ordered by, which distinct needs selected.
+        selected = sparse_columns(
+            fields, MatchModel.derived,
+            ("match_id", "timestamp", "community_name")
+        )
+        columns = [column for column in columns if column.name in selected]
+
+    query = select(columns)
 
     if search:
         like_search = "%{}%".format(search)
@@ -200,4 +218,7 @@ async def matches(search: str = None,
     ).limit(limit).offset((page - 1) * limit if page > 1 else 0)
 
     async for row in Sessions.database.iterate(query=query):
-        yield MatchModel(**row), Match(row["match_id"], row["community_name"])
+        yield (
+            SparseModel(row, fields, MatchModel.derived) if fields
+            else MatchModel(**row)
+        ), Match(row["match_id"], row["community_name"])
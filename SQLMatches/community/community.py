@@ -23,7 +23,7 @@ DEALINGS IN THE SOFTWARE.
 
 from typing import AsyncGenerator, List, Tuple
 from uuid import uuid4
-from datetime import datetime
+from datetime import datetime, date
 from secrets import token_urlsafe
 from email.mime.text import MIMEText
 
@@ -39,6 +39,7 @@ from ..decorators import (
 
 
 from ..templates import render_html
+from ..responses import format_timestamp
 
 from ..tables import (
     community_table,
@@ -47,7 +48,9 @@ from ..tables import (
     user_table,
     api_key_table,
     statistic_table,
-    server_table
+    server_table,
+    player_match_table,
+    match_rollup_table
 )
 
 from ..exceptions import (
@@ -63,10 +66,14 @@ from .models import (
     ProfileModel,
     CommunityStatsModel, ProfileOverviewModel,
     PublicCommunityModel,
-    ServerModel
+    ServerModel,
+    RollupModel,
+    SparseModel,
+    sparse_columns
 )
 
 from ..user import create_user
+from ..rollups import rollup_matches
 
 from .key import Key
 from .match import Match
@@ -126,21 +133,42 @@ class Community:
         else:
             return ServerModel(**values), self.server(ip, port)
 
-    async def servers(self) -> AsyncGenerator[ServerModel, Server]:
+    async def servers(self, fields: List[str] = None
+                      ) -> AsyncGenerator[ServerModel, Server]:
         """Used to list servers.
 
+        Parameters
+        ----------
+        fields : List[str], optional
+            Only select & serialize these fields, by default None
+
         Yields
         -------
         ServerModel
+            SparseModel if fields passed.
         Server
         """
 
-        query = server_table.select().where(
+        if fields:
+            columns = sparse_columns(
+                fields, ServerModel.derived, ("ip", "port")
+            )
+            query = select([
+                column for column in server_table.c
+                if column.name in columns
+            ])
+        else:
+            query = server_table.select()
+
+        query = query.where(
             server_table.c.community_name == self.community_name
         )
 
         async for row in Sessions.database.iterate(query):
-            yield ServerModel(**row), self.server(row["ip"], row["port"])
+            yield (
+                SparseModel(row, fields, ServerModel.derived) if fields
+                else ServerModel(**row)
+            ), self.server(row["ip"], row["port"])
 
     def server(self, ip: str, port: int) -> Server:
         """Used to interact with a server.
@@ -187,7 +215,7 @@ class Community:
         message["To"] = community.email
         message["Subject"] = "{} - {}".format(
             title,
-            (datetime.now()).strftime(Config.timestamp_format)
+            format_timestamp(datetime.now())
         )
 
         await Sessions.smtp.send_message(message)
@@ -377,6 +405,73 @@ class Community:
             **await Sessions.database.fetch_one(query)
         )
 
+    async def daily_rollups(self, since: date, map_name: str = None
+                            ) -> AsyncGenerator[RollupModel, None]:
+        """Lists match totals per day.
+
+        Parameters
+        ----------
+        since : date
+        map_name : str, optional
+            Only include this map, by default None
+
+        Yields
+        ------
+        RollupModel
+        """
+
+        query = select([
+            match_rollup_table.c.day,
+            func.sum(match_rollup_table.c.matches).label("matches"),
+            func.sum(match_rollup_table.c.rounds).label("rounds")
+        ]).select_from(match_rollup_table).where(
+            and_(
+                match_rollup_table.c.community_name == self.community_name,
+                match_rollup_table.c.day >= since
+            )
+        )
+
+        if map_name:
+            query = query.where(match_rollup_table.c.map == map_name)
+
+        query = query.group_by(
+            match_rollup_table.c.day
+        ).order_by(match_rollup_table.c.day.asc())
+
+        async for row in Sessions.database.iterate(query):
+            yield RollupModel(**row)
+
+    async def map_rollups(self, since: date
+                          ) -> AsyncGenerator[RollupModel, None]:
+        """Lists match totals per map, most played first.
+
+        Parameters
+        ----------
+        since : date
+
+        Yields
+        ------
+        RollupModel
+        """
+
+        matches = func.sum(match_rollup_table.c.matches).label("matches")
+
+        query = select([
+            match_rollup_table.c.map,
+            matches,
+            func.sum(match_rollup_table.c.rounds).label("rounds")
+        ]).select_from(match_rollup_table).where(
+            and_(
+                match_rollup_table.c.community_name == self.community_name,
+                match_rollup_table.c.day >= since
+            )
+        ).group_by(
+            match_rollup_table.c.map
+        ).order_by(matches.desc())
+
+        async for row in Sessions.database.iterate(query):
+            yield RollupModel(**row)
+
     async def profile(self, steam_id: str) -> ProfileModel:
         """Get user profile.
 
@@ -423,7 +518,8 @@ class Community:
             raise InvalidSteamID()
 
     async def players(self, search: str = None, page: int = 1,
-                      limit: int = 8, desc: bool = True
+                      limit: int = 8, desc: bool = True,
+                      fields: List[str] = None
                       ) -> AsyncGenerator[ProfileOverviewModel, None]:
         """Used to list community players.
 
@@ -437,20 +533,31 @@ class Community:
             by default 8
         desc : bool, optional
             by default True
+        fields : List[str], optional
+            Only select & serialize these fields, by default None
 
         Yields
         ------
         ProfileOverviewModel
+            SparseModel if fields passed.
         """
 
-        query = select([
+        columns = [
             user_table.c.name,
             statistic_table.c.steam_id,
             statistic_table.c.kills,
             statistic_table.c.headshots,
             statistic_table.c.assists,
             statistic_table.c.deaths
-        ]).select_from(
+        ]
+
+        if fields:
+            selected = sparse_columns(fields, ProfileOverviewModel.derived)
+            columns = [
+                column for column in columns if column.name in selected
+            ]
+
+        query = select(columns).select_from(
             statistic_table.join(
                 user_table,
                 user_table.c.steam_id == statistic_table.c.steam_id
@@ -473,7 +580,9 @@ class Community:
         ).limit(limit).offset((page - 1) * limit if page > 1 else 0)
 
         async for row in Sessions.database.iterate(query):
-            yield ProfileOverviewModel(**row)
+            yield SparseModel(
+                row, fields, ProfileOverviewModel.derived
+            ) if fields else ProfileOverviewModel(**row)
 
     async def delete_matches(self, matches: List[str]) -> None:
         """Used to bulk delete matches.
@@ -484,6 +593,11 @@ class Community:
             List of match IDs to delete.
         """
 
+        await rollup_matches(
+            [(match_id, self.community_name) for match_id in matches],
+            remove=True
+        )
+
         await Sessions.database.execute(
             scoreboard_total_table.delete().where(
                 scoreboard_total_table.c.match_id ==
@@ -497,6 +611,16 @@ class Community:
             )
         )
 
+        await Sessions.database.execute(
+            player_match_table.delete().where(
+                and_(
+                    player_match_table.c.community_name ==
+                    self.community_name,
+                    player_match_table.c.match_id.in_(matches)
+                )
+            )
+        )
+
         # Todo
         # Work out sqlalchemy left joining delete,
         # so i don't need this ugly mess.
@@ -676,7 +800,8 @@ class Community:
 
     async def matches(self, search: str = None,
                       page: int = 1, limit: int = 10, desc: bool = True,
-                      require_scoreboard: bool = True
+                      require_scoreboard: bool = True,
+                      fields: List[str] = None
                       ) -> AsyncGenerator[MatchModel, Match]:
         """Lists matches.
 
@@ -690,16 +815,18 @@ class Community:
         require_scoreboard : bool, optional
             If enabled scoreboard will need to be ready
             to pull match, by default True
+        fields : List[str], optional
+            Only select & serialize these fields, by default None
 
         Yields
         ------
         MatchModel
-            Holds basic match details.
+            Holds basic match details, SparseModel if fields passed.
         Match
             Used for interacting with a match.
         """
 
-        query = select([
+        columns = [
             scoreboard_total_table.c.match_id,
             scoreboard_total_table.c.timestamp,
             scoreboard_total_table.c.status,
@@ -712,7 +839,18 @@ class Community:
             scoreboard_total_table.c.team_1_side,
             scoreboard_total_table.c.team_2_side,
             scoreboard_total_table.c.community_name
-        ])
+        ]
+
+        if fields:
+            # Timestamp is ordered by, which distinct needs selected.
+            selected = sparse_columns(
+                fields, MatchModel.derived, ("match_id", "timestamp")
+            )
+            columns = [
+                column for column in columns if column.name in selected
+            ]
+
+        query = select(columns)
 
         if search:
             like_search = "%{}%".format(search)
@@ -766,6 +904,120 @@ class Community:
             else scoreboard_total_table.c.timestamp.asc()
         ).limit(limit).offset((page - 1) * limit if page > 1 else 0)
 
+        async for row in Sessions.database.iterate(query=query):
+            yield (
+                SparseModel(row, fields, MatchModel.derived) if fields
+                else MatchModel(**row)
+            ), self.match(row["match_id"])
+
+    async def export_matches(self, chunk_size: int = 500
+                             ) -> AsyncGenerator[MatchModel, None]:
+        """Lists every match ordered by match ID, fetched
+        in chunks so memory stays flat.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Matches fetched per query, by default 500
+
+        Yields
+        ------
+        MatchModel
+        """
+
+        query = select([
+            scoreboard_total_table.c.match_id,
+            scoreboard_total_table.c.timestamp,
+            scoreboard_total_table.c.status,
+            scoreboard_total_table.c.demo_status,
+            scoreboard_total_table.c.map,
+            scoreboard_total_table.c.team_1_name,
+            scoreboard_total_table.c.team_2_name,
+            scoreboard_total_table.c.team_1_score,
+            scoreboard_total_table.c.team_2_score,
+            scoreboard_total_table.c.team_1_side,
+            scoreboard_total_table.c.team_2_side,
+            scoreboard_total_table.c.community_name
+        ]).select_from(
+            scoreboard_total_table
+        ).order_by(
+            scoreboard_total_table.c.match_id.asc()
+        ).limit(chunk_size)
+
+        last_match_id = ""
+        while True:
+            rows = await Sessions.database.fetch_all(query.where(
+                and_(
+                    scoreboard_total_table.c.community_name ==
+                    self.community_name,
+                    scoreboard_total_table.c.match_id > last_match_id
+                )
+            ))
+
+            for row in rows:
+                yield MatchModel(**row)
+
+            if len(rows) < chunk_size:
+                break
+
+            last_match_id = rows[-1]["match_id"]
+
+    async def player_matches(self, steam_id: str, page: int = 1,
+                             limit: int = 10, desc: bool = True
+                             ) -> AsyncGenerator[MatchModel, Match]:
+        """Lists matches a player has been apart of.
+
+        Parameters
+        ----------
+        steam_id : str
+        page : int, optional
+            by default 1
+        limit : int, optional
+            by default 10
+        desc : bool, optional
+            by default True
+
+        Yields
+        ------
+        MatchModel
+            Holds basic match details.
+        Match
+            Used for interacting with a match.
+        """
+
+        query = select([
+            scoreboard_total_table.c.match_id,
+            scoreboard_total_table.c.timestamp,
+            scoreboard_total_table.c.status,
+            scoreboard_total_table.c.demo_status,
+            scoreboard_total_table.c.map,
+            scoreboard_total_table.c.team_1_name,
+            scoreboard_total_table.c.team_2_name,
+            scoreboard_total_table.c.team_1_score,
+            scoreboard_total_table.c.team_2_score,
+            scoreboard_total_table.c.team_1_side,
+            scoreboard_total_table.c.team_2_side,
+            scoreboard_total_table.c.community_name
+        ]).select_from(
+            player_match_table.join(
+                scoreboard_total_table,
+                and_(
+                    scoreboard_total_table.c.match_id ==
+                    player_match_table.c.match_id,
+                    scoreboard_total_table.c.community_name ==
+                    player_match_table.c.community_name
+                )
+            )
+        ).where(
+            and_(
+                player_match_table.c.steam_id == steam_id,
+                player_match_table.c.community_name == self.community_name
+            )
+        ).order_by(
+            player_match_table.c.timestamp.desc() if desc
+            else player_match_table.c.timestamp.asc()
+        ).limit(limit).offset((page - 1) * limit if page > 1 else 0)
+
         async for row in Sessions.database.iterate(query=query):
             yield MatchModel(**row), self.match(row["match_id"])
 
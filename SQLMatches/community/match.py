@@ -32,10 +32,12 @@ from asyncio import sleep
 from ..on_conflict import (
     on_scoreboard_conflict,
     on_user_conflict,
-    on_statistic_conflict
+    on_statistic_conflict,
+    on_player_match_conflict
 )
 from ..tables import scoreboard_total_table, scoreboard_table, user_table
 from ..resources import Sessions
+from ..rollups import rollup_matches
 
 from .models import ScoreboardModel
 from ..exceptions import InvalidMatchID
@@ -143,7 +145,17 @@ class Match:
             Raised when match ID is invalid.
         """
 
-        if not await self.exists():
+        match_timestamp = await Sessions.database.fetch_val(
+            select([scoreboard_total_table.c.timestamp]).where(
+                and_(
+                    scoreboard_total_table.c.match_id == self.match_id,
+                    scoreboard_total_table.c.community_name ==
+                    self.community_name
+                )
+            )
+        )
+
+        if match_timestamp is None:
             raise InvalidMatchID()
 
         team_sides = {}
@@ -157,7 +169,6 @@ class Match:
         query = scoreboard_total_table.update().values(
             team_1_score=team_1_score,
             team_2_score=team_2_score,
-            status=0 if end else 1,
             **team_sides
         ).where(
             and_(
@@ -178,6 +189,9 @@ class Match:
             statistics = []
             statistics_append = statistics.append
 
+            player_matches = []
+            player_matches_append = player_matches.append
+
             now = datetime.now()
 
             for player in players:
@@ -216,6 +230,13 @@ class Match:
                     "mvps": player["mvps"]
                 })
 
+                player_matches_append({
+                    "steam_id": player["steam_id"],
+                    "match_id": self.match_id,
+                    "community_name": self.community_name,
+                    "timestamp": match_timestamp
+                })
+
                 await sleep(0.000001)
 
             await Sessions.database.execute_many(
@@ -233,8 +254,21 @@ class Match:
                 values=statistics
             )
 
-    async def end(self) -> None:
-        """Sets match status to 0
+            await Sessions.database.execute_many(
+                query=on_player_match_conflict(),
+                values=player_matches
+            )
+
+        if end:
+            await self.end()
+
+    async def end(self) -> bool:
+        """Sets match status to 0 & adds it to the daily rollups.
+
+        Returns
+        -------
+        bool
+            If this call ended the match, False if it already ended.
 
         Raises
         ------
@@ -242,19 +276,42 @@ class Match:
             Raised when match ID is invalid.
         """
 
-        query = scoreboard_total_table.update().values(
-            status=0
-        ).where(
-            and_(
-                scoreboard_total_table.c.match_id == self.match_id,
-                scoreboard_total_table.c.community_name == self.community_name
-            )
+        where_statement = and_(
+            scoreboard_total_table.c.match_id == self.match_id,
+            scoreboard_total_table.c.community_name == self.community_name
         )
 
-        try:
-            await Sessions.database.execute(query=query)
-        except Exception:
-            raise InvalidMatchID()
+        # The row is locked so racing end requests & match enders
+        # wait here, only the one what moves the match off status 1
+        # rolls it up. execute doesn't report a rowcount on every
+        # engine, so it can't decide this alone.
+        async with Sessions.database.transaction():
+            status = await Sessions.database.fetch_val(
+                select([scoreboard_total_table.c.status]).where(
+                    where_statement
+                ).with_for_update()
+            )
+
+            if status is None:
+                raise InvalidMatchID()
+
+            if status != 1:
+                return False
+
+            await Sessions.database.execute(
+                scoreboard_total_table.update().values(
+                    status=0
+                ).where(
+                    and_(
+                        where_statement,
+                        scoreboard_total_table.c.status == 1
+                    )
+                )
+            )
+
+            await rollup_matches([(self.match_id, self.community_name)])
+
+        return True
 
     async def scoreboard(self) -> ScoreboardModel:
         """Gets scoreboard data.
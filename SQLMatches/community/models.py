@@ -20,13 +20,89 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Any, Dict, Generator, List
-from datetime import datetime
+from typing import Any, Callable, Dict, Generator, List, Mapping, Set, \
+    Tuple
+from datetime import datetime, date
 
 from ..resources import Config
 
 
+def cover_image(map_name: str) -> str:
+    """URL of a map's cover image, from the table
+    built once off Config.map_images.
+
+    Parameters
+    ----------
+    map_name : str
+
+    Returns
+    -------
+    str
+    """
+
+    return Config.cover_images.get(map_name, Config.invalid_cover_image)
+
+
+def sparse_columns(fields: List[str],
+                   derived: Dict[str, Tuple[str, Callable]],
+                   required: Tuple[str, ...] = ()) -> Set[str]:
+    """Columns needed to serialize fields.
+
+    Parameters
+    ----------
+    fields : List[str]
+    derived : Dict[str, Tuple[str, Callable]]
+        Fields computed from a column.
+    required : Tuple[str, ...], optional
+        Columns always selected, by default ()
+
+    Returns
+    -------
+    Set[str]
+    """
+
+    return {
+        derived[field][0] if field in derived else field
+        for field in fields
+    }.union(required)
+
+
+class SparseModel:
+    __slots__ = ("row", "fields", "derived")
+
+    def __init__(self, row: Mapping, fields: List[str],
+                 derived: Dict[str, Tuple[str, Callable]]) -> None:
+        """Holds only the fields requested of a model.
+
+        Parameters
+        ----------
+        row : Mapping
+        fields : List[str]
+        derived : Dict[str, Tuple[str, Callable]]
+            Fields computed from a column.
+        """
+
+        self.row = row
+        self.fields = fields
+        self.derived = derived
+
+    @property
+    def api_schema(self) -> dict:
+        schema = {}
+        for field in self.fields:
+            if field in self.derived:
+                column, derive = self.derived[field]
+                schema[field] = derive(self.row[column])
+            else:
+                schema[field] = self.row[field]
+
+        return schema
+
+
 class _DepthStatsModel:
+    # Slots are declared by subclasses.
+    __slots__ = ()
+
     def __init__(self, kills: int, deaths: int,
                  headshots: int, shots_hit: int,
                  shots_fired: int) -> None:
@@ -59,6 +135,9 @@ class _DepthStatsModel:
 
 
 class PublicCommunityModel:
+    __slots__ = ("owner_id", "disabled", "community_name", "timestamp",
+                 "banned", "allow_api_access")
+
     def __init__(self, owner_id: str, disabled: bool, community_name: str,
                  timestamp: datetime, banned: bool,
                  allow_api_access: bool) -> None:
@@ -75,13 +154,17 @@ class PublicCommunityModel:
             "community_name": self.community_name,
             "owner_id": self.owner_id,
             "disabled": self.disabled,
-            "timestamp": self.timestamp.strftime(Config.timestamp_format),
+            "timestamp": self.timestamp,
             "banned": self.banned,
             "allow_api_access": self.allow_api_access
         }
 
 
 class CommunityModel(PublicCommunityModel):
+    __slots__ = ("master_api_key", "amount", "match_start_webhook",
+                 "round_end_webhook", "match_end_webhook", "customer_id",
+                 "email", "cancelled", "subscription_expires")
+
     def __init__(self, api_key: str,
                  match_start_webhook: str,
                  round_end_webhook: str,
@@ -115,14 +198,20 @@ class CommunityModel(PublicCommunityModel):
             "customer_id": self.customer_id,
             "email": self.email,
             "cancelled": self.cancelled,
-            "subscription_expires": self.subscription_expires.strftime(
-                Config.timestamp_format
-            ) if self.subscription_expires else None,
+            "subscription_expires": self.subscription_expires,
             **super().api_schema
         }
 
 
 class MatchModel:
+    __slots__ = ("match_id", "timestamp", "status", "demo_status", "map",
+                 "team_1_name", "team_2_name", "team_1_score",
+                 "team_2_score", "team_1_side", "team_2_side",
+                 "community_name")
+
+    derived = {"cover_image": ("map", cover_image)}
+    schema_fields = __slots__ + tuple(derived)
+
     def __init__(self, match_id: str, timestamp: datetime, status: int,
                  demo_status: int, map: str, team_1_name: str,
                  team_2_name: str, team_1_score: int,
@@ -139,18 +228,17 @@ class MatchModel:
         self.team_2_score = team_2_score
         self.team_1_side = team_1_side
         self.team_2_side = team_2_side
-        self.cover_image = "{}maps/{}".format(
-            Config.url,
-            Config.map_images[self.map] if self.map in Config.map_images
-            else "invalid.png"
-        )
         self.community_name = community_name
 
+    @property
+    def cover_image(self) -> str:
+        return cover_image(self.map)
+
     @property
     def api_schema(self) -> dict:
         return {
             "match_id": self.match_id,
-            "timestamp": self.timestamp.strftime(Config.timestamp_format),
+            "timestamp": self.timestamp,
             "status": self.status,
             "demo_status": self.demo_status,
             "map": self.map,
@@ -160,12 +248,18 @@ class MatchModel:
             "team_2_score": self.team_2_score,
             "team_1_side": self.team_1_side,
             "team_2_side": self.team_2_side,
-            "cover_image": self.cover_image,
+            "cover_image": cover_image(self.map),
             "community_name": self.community_name
         }
 
 
 class ProfileOverviewModel:
+    __slots__ = ("name", "steam_id", "kills", "headshots", "assists",
+                 "deaths")
+
+    derived = {}
+    schema_fields = __slots__
+
     def __init__(self, name: str, steam_id: str, kills: int, headshots: int,
                  assists: int, deaths: int) -> None:
         self.name = name
@@ -188,6 +282,8 @@ class ProfileOverviewModel:
 
 
 class ProfileModel(ProfileOverviewModel, _DepthStatsModel):
+    __slots__ = ("shots_fired", "shots_hit", "mvps", "timestamp")
+
     def __init__(self, shots_fired: int, shots_hit: int,
                  mvps: int, timestamp: datetime, **kwargs) -> None:
         super().__init__(**kwargs)
@@ -212,11 +308,15 @@ class ProfileModel(ProfileOverviewModel, _DepthStatsModel):
             "shots_fired": self.shots_fired,
             "shots_hit": self.shots_hit,
             "mvps": self.mvps,
-            "timestamp": self.timestamp.strftime(Config.timestamp_format)
+            "timestamp": self.timestamp
         }
 
 
 class _ScoreboardPlayerModel(_DepthStatsModel):
+    __slots__ = ("name", "steam_id", "team", "alive", "ping", "kills",
+                 "headshots", "assists", "deaths", "shots_fired",
+                 "shots_hit", "mvps", "score", "disconnected")
+
     def __init__(self, name: str, steam_id: str, team: int,
                  alive: bool, ping: int, kills: int, headshots: int,
                  assists: int, deaths: int, shots_fired: int,
@@ -242,6 +342,8 @@ class _ScoreboardPlayerModel(_DepthStatsModel):
 
 
 class ScoreboardModel(MatchModel):
+    __slots__ = ("__team_1", "__team_2")
+
     def __init__(self, team_1: List[Dict[str, Any]],
                  team_2: List[Dict[str, Any]], match: Dict[str, Any]) -> None:
         super().__init__(**match)
@@ -283,6 +385,9 @@ class ScoreboardModel(MatchModel):
 
 
 class CommunityStatsModel:
+    __slots__ = ("total_matches", "active_matches", "stored_demos",
+                 "total_users")
+
     def __init__(self, total_matches: int, active_matches: int,
                  stored_demos: int, total_users: int) -> None:
         self.total_matches = total_matches
@@ -301,6 +406,12 @@ class CommunityStatsModel:
 
 
 class ServerModel:
+    __slots__ = ("community_name", "ip", "port", "name", "players",
+                 "max_players", "map")
+
+    derived = {"cover_image": ("map", cover_image)}
+    schema_fields = __slots__ + tuple(derived)
+
     def __init__(self, community_name: str, ip: str,
                  port: int, name: str, players: int,
                  max_players: int, map: str) -> None:
@@ -311,11 +422,10 @@ class ServerModel:
         self.players = players
         self.max_players = max_players
         self.map = map
-        self.cover_image = "{}maps/{}".format(
-            Config.url,
-            Config.map_images[self.map] if self.map in Config.map_images
-            else "invalid.png"
-        )
+
+    @property
+    def cover_image(self) -> str:
+        return cover_image(self.map)
 
     @property
     def api_schema(self) -> dict:
@@ -327,5 +437,33 @@ class ServerModel:
             "ip": self.ip,
             "port": self.port,
             "map": self.map,
-            "cover_image": self.cover_image
+            "cover_image": cover_image(self.map)
+        }
+
+
+class RollupModel:
+    __slots__ = ("matches", "rounds", "day", "map")
+
+    def __init__(self, matches: int, rounds: int, day: date = None,
+                 map: str = None) -> None:
+        self.matches = int(matches)
+        self.rounds = int(rounds)
+        self.day = day
+        self.map = map
+
+    @property
+    def average_rounds(self) -> float:
+        return (
+            round(self.rounds / self.matches, 2)
+            if self.matches > 0 else 0.00
+        )
+
+    @property
+    def api_schema(self) -> dict:
+        return {
+            "day": self.day,
+            "map": self.map,
+            "matches": self.matches,
+            "rounds": self.rounds,
+            "average_rounds": self.average_rounds
         }
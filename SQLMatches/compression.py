@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import gzip
+import zlib
+
+from hashlib import blake2b
+from typing import Any, List, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from .resources import Sessions, Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+GZIP = "gzip"
+BROTLI = "br"
+ZSTD = "zstd"
+
+# Preferred first, only encodings with their library installed.
+ENCODINGS: List[str] = [
+    encoding for encoding, available in (
+        (BROTLI, brotli is not None),
+        (ZSTD, zstandard is not None),
+        (GZIP, True)
+    ) if available
+]
+
+# Levels used when compressing per request.
+LIVE_LEVELS = {GZIP: 6, BROTLI: 4, ZSTD: 3}
+# Levels used when a body is compressed once & cached.
+CACHED_LEVELS = {GZIP: 9, BROTLI: 9, ZSTD: 12}
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Picks the encoding to respond with.
+
+    Paramters
+    ---------
+    accept_encoding: str
+        Value of the Accept-Encoding header.
+
+    Returns
+    -------
+    str
+        None if no supported encoding accepted.
+    """
+
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        encoding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params[:2] == "q=":
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+
+        accepted.add(encoding.strip())
+
+    for encoding in ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+
+    return None
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Compresses a whole body.
+
+    Paramters
+    ---------
+    body: bytes
+    encoding: str
+    cached: bool
+        If the result is reused, spends more time compressing.
+    """
+
+    level = (CACHED_LEVELS if cached else LIVE_LEVELS)[encoding]
+
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=level)
+    elif encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    else:
+        return gzip.compress(body, compresslevel=level)
+
+
+class StreamCompressor:
+    def __init__(self, encoding: str) -> None:
+        """Compresses a body sent in chunks.
+
+        Paramters
+        ---------
+        encoding: str
+        """
+
+        level = LIVE_LEVELS[encoding]
+
+        if encoding == BROTLI:
+            self.__compressor = brotli.Compressor(quality=level)
+            self.__compress = self.__compressor.process
+            self.__finish = self.__compressor.finish
+        elif encoding == ZSTD:
+            self.__compressor = zstandard.ZstdCompressor(
+                level=level
+            ).compressobj()
+            self.__compress = self.__compressor.compress
+            self.__finish = self.__compressor.flush
+        else:
+            self.__compressor = zlib.compressobj(
+                level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self.__compress = self.__compressor.compress
+            self.__finish = self.__compressor.flush
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self.__compress(chunk)
+
+    def finish(self) -> bytes:
+        return self.__finish()
+
+
+def weak_etag(etag: str) -> str:
+    """Compressed bodies aren't byte for byte the same
+    as the identity body, so only weakly validated.
+
+    Paramters
+    ---------
+    etag: str
+    """
+
+    if etag[:2] == "W/":
+        return etag
+
+    return "W/" + etag
+
+
+async def compressed_variant(key: str, body: bytes, encoding: str) -> bytes:
+    """Compresses body once, storing the result alongside
+    the cached entry key is for.
+
+    Paramters
+    ---------
+    key: str
+        Key of the cached entry body came from.
+    body: bytes
+    encoding: str
+    """
+
+    variant_key = "{}:{}:{}".format(
+        key, encoding, blake2b(body, digest_size=8).hexdigest()
+    )
+
+    found, compressed = Sessions.local_cache.get(variant_key)
+    if found:
+        return compressed
+
+    # Stored raw, bypassing the cache serializer.
+    if Sessions.redis:
+        compressed = await Sessions.redis.get(variant_key)
+    else:
+        compressed = await Sessions.cache.get(variant_key)
+
+    if compressed is None:
+        compressed = compress(body, encoding, cached=True)
+
+        if Sessions.redis:
+            await Sessions.redis.set(
+                variant_key, compressed, expire=Config.cache_hard_ttl
+            )
+        else:
+            await Sessions.cache.set(
+                variant_key, compressed, ttl=Config.cache_hard_ttl
+            )
+
+    Sessions.local_cache.set(variant_key, compressed)
+
+    return compressed
+
+
+class PrecompressedResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, body: bytes, key: str, **kwargs: Any) -> None:
+        """Responds with a compressed variant of a cached body,
+        compressed once per change instead of once per request.
+
+        Paramters
+        ---------
+        body: bytes
+        key: str
+            Key of the cached entry body came from.
+        """
+
+        super().__init__(body, **kwargs)
+
+        self.key = key
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        encoding = None
+        if Config.precompress and \
+                len(self.body) >= Config.compress_min_size:
+            encoding = negotiate(
+                Headers(scope=scope).get("Accept-Encoding", "")
+            )
+
+        if encoding:
+            self.body = await compressed_variant(
+                self.key, self.body, encoding
+            )
+
+            self.headers["Content-Encoding"] = encoding
+            self.headers["Content-Length"] = str(len(self.body))
+            self.headers.add_vary_header("Accept-Encoding")
+
+            if "ETag" in self.headers:
+                self.headers["ETag"] = weak_etag(self.headers["ETag"])
+
+        await super().__call__(scope, receive, send)
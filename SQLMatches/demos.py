@@ -27,20 +27,75 @@ import aiofiles
 
 from starlette.requests import Request
 from sqlalchemy.sql import and_, select, func
-from typing import Any
+from typing import Any, AsyncGenerator, Generator
 from datetime import datetime
 
 from backblaze.exceptions import BackblazeException
 
 from os import path
+from aiofiles import os as aiofiles_os
 from backblaze.settings import PartSettings, UploadSettings
 
 from .community.match import Match
+from .exceptions import DemoTooLarge
 from .resources import Config, Sessions
 from .settings import B2UploadSettings, LocalUploadSettings
 from .tables import scoreboard_total_table, community_table
 
 
+# Backblaze's minimum size for every part but the last.
+PART_SIZE = 5000000
+
+
+class PartBuffer:
+    def __init__(self, size: int = PART_SIZE) -> None:
+        """Assembles streamed chunks into parts of a fixed size
+        inside one preallocated buffer.
+
+        Parameters
+        ----------
+        size : int, optional
+            by default PART_SIZE
+        """
+
+        self.size = size
+        self.length = 0
+
+        self.__view = memoryview(bytearray(size))
+
+    @property
+    def remaining(self) -> memoryview:
+        """Bytes buffered since the last full part."""
+
+        return self.__view[:self.length]
+
+    def feed(self, chunk: bytes) -> Generator[memoryview, None, None]:
+        """Copies a chunk into the buffer.
+
+        Parameters
+        ----------
+        chunk : bytes
+
+        Yields
+        ------
+        memoryview
+            Every part the chunk fills, only valid until the
+            generator is resumed.
+        """
+
+        chunk = memoryview(chunk)
+        while chunk:
+            take = min(self.size - self.length, len(chunk))
+
+            self.__view[self.length:self.length + take] = chunk[:take]
+            self.length += take
+            chunk = chunk[take:]
+
+            if self.length == self.size:
+                self.length = 0
+                yield self.__view
+
+
 class Demo:
     def __init__(self, match: Match, request: Request = None) -> None:
         """Wrapper for demo uploading.
@@ -89,22 +144,21 @@ class Demo:
             self.match.community_name
         )
 
-    async def __invalid_upload(self, total_size: int) -> bool:
-        """Used to see if upload size is invalid.
-
-        Parameters
-        ----------
-        total_size : int
-            Total size in bytes.
+    async def __upload_limit(self) -> int:
+        """Resolves the largest demo the community can upload.
 
         Returns
         -------
-        bool
-            If invalid or not.
+        int
+            Limit in bytes.
+
+        Raises
+        ------
+        DemoTooLarge
+            Raised when the Content-Length is already above it.
         """
 
-        if total_size == 0:
-            return False
+        assert self.request
 
         allow_max_upload = bool(await Sessions.database.fetch_val(
             select([func.count()]).select_from(community_table).where(
@@ -116,12 +170,39 @@ class Demo:
             )
         ))
 
-        size_in_mb = total_size / 1000000
+        max_size = int((
+            Config.max_upload_size if allow_max_upload
+            else Config.free_upload_size
+        ) * 1000000)
 
-        return (
-            size_in_mb > Config.max_upload_size if allow_max_upload
-            else size_in_mb > Config.free_upload_size
-        )
+        content_length = self.request.headers.get("content-length")
+        if content_length and content_length.isdigit() \
+                and int(content_length) > max_size:
+            raise DemoTooLarge()
+
+        return max_size
+
+    async def __stream(self, max_size: int
+                       ) -> AsyncGenerator[bytes, None]:
+        """Streams the demo, stopping as soon as it passes the limit.
+
+        Parameters
+        ----------
+        max_size : int
+            Limit in bytes.
+
+        Raises
+        ------
+        DemoTooLarge
+        """
+
+        total_size = 0
+        async for chunk in self.request.stream():
+            total_size += len(chunk)
+            if total_size > max_size:
+                raise DemoTooLarge()
+
+            yield chunk
 
     async def __update_value(self, **kwargs) -> None:
         await Sessions.database.execute(
@@ -169,41 +250,44 @@ class Demo:
             await self.__update_value(demo_status=4)
             return True
 
-    async def __local_upload(self) -> bool:
+    async def __local_upload(self) -> None:
         """Used to upload file locally.
 
-        Returns
-        -------
-        bool
-            If demo uploaded.
+        Raises
+        ------
+        DemoTooLarge
+            Raised when the demo is above the community's limit,
+            the partial file is removed.
         """
 
-        assert self.request
+        max_size = await self.__upload_limit()
 
-        async with aiofiles.open(self.__demo_pathway, "wb+") as f:
-            total_size = 0
-            async for chunk in self.request.stream():
-                await f.write(chunk)
-                total_size += len(chunk)
+        opened = False
+        try:
+            async with aiofiles.open(self.__demo_pathway, "wb+") as f:
+                opened = True
 
-                await asyncio.sleep(Config.upload_delay)
+                async for chunk in self.__stream(max_size):
+                    await f.write(chunk)
 
-            if await self.__invalid_upload(total_size):
-                await f.truncate()
-                return False
-            else:
-                return True
+                    await asyncio.sleep(Config.upload_delay)
+        except Exception:
+            # Removed once closed, else the error opening it is kept.
+            if opened:
+                await aiofiles_os.remove(self.__demo_pathway)
+            raise
 
-    async def __b2_upload(self) -> bool:
+    async def __b2_upload(self) -> None:
         """Used to upload demo to b2.
 
-        Returns
-        -------
-        bool
-            If demo uploaded.
+        Raises
+        ------
+        DemoTooLarge
+            Raised when the demo is above the community's limit,
+            any uploaded parts are cancelled.
         """
 
-        assert self.request
+        max_size = await self.__upload_limit()
 
         content_type = "application/octet-stream"
 
@@ -213,21 +297,23 @@ class Demo:
         ))
 
         parts = file.parts()
+        buffer = PartBuffer()
 
-        chunked = b""
-        total_size = 0
-        async for chunk in self.request.stream():
-            chunked += chunk
-
-            if len(chunked) >= 5000000:
-                await parts.data(chunked)
+        try:
+            async for chunk in self.__stream(max_size):
+                for part in buffer.feed(chunk):
+                    # httpx only posts bytes, so each part is copied once.
+                    await parts.data(bytes(part))
 
-                total_size += len(chunked)
-                chunked = b""
+                # Throttled per chunk, like local uploads.
+                await asyncio.sleep(Config.upload_delay)
+        except Exception:
+            await file.cancel()
+            raise
 
-            await asyncio.sleep(Config.upload_delay)
+        if buffer.length:
+            chunked = bytes(buffer.remaining)
 
-        if chunked:
             if parts.part_number == 0:
                 await file.cancel()
 
@@ -238,17 +324,10 @@ class Demo:
 
                 await self.__update_value(b2_id=model.file_id)
 
-                return True
-            else:
-                await parts.data(chunked)
-                total_size += len(chunked)
+                return
 
-        if await self.__invalid_upload(total_size):
-            await file.cancel()
-            return False
-        else:
-            await parts.finish()
+            await parts.data(chunked)
 
-            await self.__update_value(b2_id=model.file_id)
+        await parts.finish()
 
-            return True
+        await self.__update_value(b2_id=model.file_id)
@@ -93,6 +93,14 @@ class DemoAlreadyUploaded(SQLMatchesException):
         super().__init__(msg, *args, **kwargs)
 
 
+class DemoTooLarge(SQLMatchesException):
+    """Raised when a demo is above the community's upload limit.
+    """
+
+    def __init__(self, msg="Demo too large", *args, **kwargs):
+        super().__init__(msg, *args, **kwargs)
+
+
 class InvalidSteamID(SQLMatchesException):
     """Raised when Steam ID isn't valid
     """
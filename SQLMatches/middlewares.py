@@ -35,6 +35,8 @@ from starlette.authentication import (
     AuthCredentials
 )
 from starlette.requests import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .community import (
     Community,
@@ -43,6 +45,8 @@ from .community import (
 )
 from .resources import Config
 from .exceptions import InvalidAPIKey, NoOwnership
+from .caches import ApiKeyCache
+from .compression import negotiate, compress, weak_etag, StreamCompressor
 
 
 AUTH_ERROR = "Invalid basic auth credentials"
@@ -79,11 +83,16 @@ class APIAuthentication(AuthenticationBackend):
 
             username, _, password = decoded.partition(":")
 
+            missing = ApiKeyCache(password).missing()
+            if await missing.missed():
+                raise AuthenticationError(AUTH_ERROR)
+
             try:
                 request.state.community, master = await api_key_to_community(
                     password
                 )
             except InvalidAPIKey:
+                await missing.miss()
                 raise AuthenticationError(AUTH_ERROR)
             else:
                 return AuthCredentials([
@@ -149,3 +158,104 @@ class APIAuthentication(AuthenticationBackend):
                     AuthCredentials(["stripe_webhook"]),
                     SimpleUser("")
                 )
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 500) -> None:
+        """Compresses responses with gzip, brotli or zstd depending
+        on what the client accepts & what's installed.
+
+        Parameters
+        ----------
+        app : ASGIApp
+        minimum_size : int, optional
+            Bodies smaller than this are sent as is, by default 500
+        """
+
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = negotiate(
+                Headers(scope=scope).get("Accept-Encoding", "")
+            )
+            if encoding:
+                await _CompressionResponder(
+                    self.app, encoding, self.minimum_size
+                )(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str,
+                 minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+
+        self.send = None
+        self.start_message = None
+        self.started = False
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def compressed_headers(self, content_length: int = None) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+
+        if "ETag" in headers:
+            headers["ETag"] = weak_etag(headers["ETag"])
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held until the first body chunk decides compression.
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.started:
+            if self.compressor:
+                message["body"] = self.compressor.compress(
+                    message.get("body", b"")
+                )
+                if not message.get("more_body", False):
+                    message["body"] += self.compressor.finish()
+
+            await self.send(message)
+            return
+
+        self.started = True
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        headers = Headers(raw=self.start_message["headers"])
+        if "Content-Encoding" in headers or \
+                (not more_body and len(body) < self.minimum_size) or \
+                headers.get("Content-Type", "").startswith(
+                    "text/event-stream"):
+            # Compressing would buffer events.
+            pass
+        elif more_body:
+            self.compressor = StreamCompressor(self.encoding)
+            self.compressed_headers()
+            message["body"] = self.compressor.compress(body)
+        else:
+            message["body"] = compress(body, self.encoding)
+            self.compressed_headers(len(message["body"]))
+
+        await self.send(self.start_message)
+        await self.send(message)
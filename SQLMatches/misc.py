@@ -25,7 +25,7 @@ from typing import List
 
 from .tables import community_type_table
 from .resources import Sessions, Config
-from .caches import CommunityCache
+from .caches import CacheBase, CommunityCache
 
 
 async def cache_community_types(community_types: List[str]):
@@ -61,29 +61,14 @@ async def cache_community_types(community_types: List[str]):
             Config.community_types[community_type] = last_id
 
 
-async def bulk_scoreboard_expire(community_name: str,
-                                 matches: List[str]) -> None:
-    """Used to expire multiple scoreboards.
-
-    Parameters
-    ----------
-    community_name : str
-    matches : List[str]
-    """
-
-    cache = CommunityCache(community_name)
-
-    for match in matches:
-        await (cache.scoreboard(match)).expire()
-
-
 async def bulk_community_expire(communities: List[str]) -> None:
-    """Used to expire communities in bulk.
+    """Used to invalidate communities in bulk.
 
     Parameters
     ----------
     communities : List[str]
     """
 
-    for community in communities:
-        await CommunityCache(community).expire()
+    await CacheBase.multi_invalidate([
+        CommunityCache(community) for community in communities
+    ])
@@ -26,7 +26,13 @@ from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 
 from typing import Any
 
-from .tables import scoreboard_table, user_table, statistic_table
+from .tables import (
+    scoreboard_table,
+    user_table,
+    statistic_table,
+    player_match_table,
+    match_rollup_table
+)
 from .resources import Config
 
 
@@ -139,3 +145,46 @@ def on_statistic_conflict() -> Any:
         )
     else:
         return statistic_table.insert
+
+
+def on_player_match_conflict() -> Any:
+    """Used for ignoring players already indexed against a match.
+    """
+
+    if Config.db_engine == "mysql":
+        query_insert = mysql_insert(player_match_table)
+        return query_insert.on_duplicate_key_update(
+            timestamp=player_match_table.c.timestamp
+        )
+    elif Config.db_engine == "psycopg2":
+        query_insert = postgresql_insert(player_match_table)
+        return query_insert.on_conflict_do_nothing()
+    else:
+        return player_match_table.insert()
+
+
+def on_rollup_conflict() -> Any:
+    """Used for adding to a daily rollup on conflict,
+    None if the engine can't add on conflict.
+    """
+
+    if Config.db_engine == "mysql":
+        query_insert = mysql_insert(match_rollup_table)
+        return query_insert.on_duplicate_key_update(
+            matches=match_rollup_table.c.matches +
+            query_insert.inserted.matches,
+            rounds=match_rollup_table.c.rounds + query_insert.inserted.rounds
+        )
+    elif Config.db_engine == "psycopg2":
+        query_insert = postgresql_insert(match_rollup_table)
+        return query_insert.on_conflict_do_update(
+            index_elements=["community_name", "day", "map"],
+            set_=dict(
+                matches=match_rollup_table.c.matches +
+                query_insert.inserted.matches,
+                rounds=match_rollup_table.c.rounds +
+                query_insert.inserted.rounds
+            )
+        )
+    else:
+        return None
@@ -22,7 +22,6 @@ DEALINGS IN THE SOFTWARE.
 
 
 import os
-import socketio
 import aioftp
 
 from typing import Any, Dict
@@ -33,6 +32,9 @@ from databases import Database
 from aiocache import Cache
 from datetime import timedelta
 from aiosmtplib import SMTP
+from aiojobs import Scheduler
+
+from .websocket_server import WebsocketServer
 
 
 class Sessions:
@@ -40,13 +42,16 @@ class Sessions:
     aiohttp: ClientSession
     bucket: AwaitingBucket
     cache: Cache
-    websocket = socketio.AsyncServer(
+    local_cache: Any
+    redis: Any = None
+    websocket = WebsocketServer(
         async_mode="asgi",
         cors_allowed_origins=[]
     )
     stripe: Any
     smtp: SMTP
     ftp: aioftp.Client
+    scheduler: Scheduler
 
 
 class Config:
@@ -63,6 +68,8 @@ class Config:
     upload_type: Any
     url: str
     map_images: str
+    cover_images: Dict[str, str]
+    invalid_cover_image: str
     db_engine: str
     demo_extension: str
     cdn_url: str
@@ -86,6 +93,18 @@ class Config:
     system_email: str
     frontend_url: str
     price_id: str
+    local_cache_size: int
+    local_cache_ttl: float
+    cache_soft_ttl: float
+    cache_hard_ttl: int
+    listing_pages: int
+    negative_ttl: int
+    browser_max_age: int
+    shared_max_age: int
+    purge_url: str
+    emit_window: float
+    compress_min_size: int
+    precompress: bool
 
 
 class DemoQueue:
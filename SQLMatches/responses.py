@@ -21,11 +21,100 @@ DEALINGS IN THE SOFTWARE.
 """
 
 
-from typing import Any
-from starlette.responses import JSONResponse
+import orjson
 
+from datetime import date, datetime, time
+from typing import Any, AsyncGenerator, AsyncIterator
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
-def error_response(error: str, **kwargs) -> JSONResponse:
+from .resources import Config
+
+
+# Bytes buffered before a streamed chunk is sent.
+STREAM_CHUNK = 65536
+
+# Config.timestamp_format values what aren't strftime formats.
+ISO_TIMESTAMPS = "iso"
+EPOCH_TIMESTAMPS = "epoch"
+
+
+def format_timestamp(value: date) -> Any:
+    """Formats a datetime or date using Config.timestamp_format.
+
+    Parameters
+    ----------
+    value : date
+
+    Returns
+    -------
+    Any
+    """
+
+    if Config.timestamp_format == ISO_TIMESTAMPS:
+        return value.isoformat()
+
+    if Config.timestamp_format == EPOCH_TIMESTAMPS:
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, time())
+
+        return int(value.timestamp())
+
+    return value.strftime(Config.timestamp_format)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, date):
+        return format_timestamp(value)
+
+    raise TypeError
+
+
+def dumps(data: Any) -> bytes:
+    """Encodes JSON, datetimes & dates are formatted
+    by Config.timestamp_format.
+
+    Parameters
+    ----------
+    data : Any
+
+    Returns
+    -------
+    bytes
+    """
+
+    if Config.timestamp_format == ISO_TIMESTAMPS:
+        # orjson formats these itself.
+        return orjson.dumps(
+            data, default=_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+    return orjson.dumps(
+        data,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class SocketIOJSON:
+    """Lets socket.io encode models the same way responses do.
+    """
+
+    @staticmethod
+    def dumps(data: Any, *args, **kwargs) -> str:
+        return dumps(data).decode()
+
+    @staticmethod
+    def loads(data: Any, *args, **kwargs) -> Any:
+        return orjson.loads(data)
+
+
+def error_response(error: str, **kwargs) -> ORJSONResponse:
     """
     Handles errors within the api.
 
@@ -38,10 +127,10 @@ def error_response(error: str, **kwargs) -> JSONResponse:
     if "status_code" not in kwargs:
         kwargs["status_code"] = 500
 
-    return JSONResponse({"data": None, "error": error}, **kwargs)
+    return ORJSONResponse({"data": None, "error": error}, **kwargs)
 
 
-def response(data: Any = None, **kwargs) -> JSONResponse:
+def response(data: Any = None, **kwargs) -> ORJSONResponse:
     """Handles a successful api response.
 
     Paramters
@@ -50,4 +139,153 @@ def response(data: Any = None, **kwargs) -> JSONResponse:
         Data to respond.
     """
 
-    return JSONResponse({"data": data, "error": False}, **kwargs)
+    return ORJSONResponse({"data": data, "error": False}, **kwargs)
+
+
+def encode(data: Any = None) -> bytes:
+    """Encodes the body of a successful api response,
+    matches what response would send.
+
+    Paramters
+    ---------
+    data: Any
+        Data to encode.
+    """
+
+    return dumps({"data": data, "error": False})
+
+
+def encoded_response(body: bytes, **kwargs) -> Response:
+    """Responds with a body already encoded by encode.
+
+    Paramters
+    ---------
+    body: bytes
+    """
+
+    return Response(body, media_type="application/json", **kwargs)
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """If the client already has the version etag is for.
+
+    Paramters
+    ---------
+    request: Request
+    etag: str
+    """
+
+    header = request.headers.get("If-None-Match")
+    if not header or not etag:
+        return False
+
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+
+        if tag == etag or tag == "*":
+            return True
+
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Responds 304 without a body.
+
+    Paramters
+    ---------
+    etag: str
+    """
+
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+async def __json_array(rows: AsyncIterator[Any]
+                       ) -> AsyncGenerator[bytes, None]:
+    buffer = bytearray(b'{"data":[')
+
+    separator = b""
+    async for row in rows:
+        buffer += separator
+        buffer += dumps(row)
+        separator = b","
+
+        if len(buffer) >= STREAM_CHUNK:
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += b'],"error":false}'
+    yield bytes(buffer)
+
+
+async def __ndjson(rows: AsyncIterator[Any]) -> AsyncGenerator[bytes, None]:
+    buffer = bytearray()
+
+    async for row in rows:
+        buffer += dumps(row)
+        buffer += b"\n"
+
+        if len(buffer) >= STREAM_CHUNK:
+            yield bytes(buffer)
+            buffer.clear()
+
+    if buffer:
+        yield bytes(buffer)
+
+
+def stream_response(rows: AsyncIterator[Any], ndjson: bool = False,
+                    **kwargs) -> StreamingResponse:
+    """Encodes rows as they're iterated, so memory stays flat
+    however many rows there are.
+
+    Paramters
+    ---------
+    rows: AsyncIterator[Any]
+    ndjson: bool
+        Sends a row per line instead of the same body
+        response would, by default False.
+    """
+
+    if ndjson:
+        return StreamingResponse(
+            __ndjson(rows), media_type="application/x-ndjson", **kwargs
+        )
+
+    return StreamingResponse(
+        __json_array(rows), media_type="application/json", **kwargs
+    )
+
+
+def server_sent_event(event: str, data: Any) -> bytes:
+    """Encodes a event for a text/event-stream.
+
+    Paramters
+    ---------
+    event: str
+    data: Any
+    """
+
+    # orjson never outputs newlines, so data is one line.
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+def event_stream(events: AsyncIterator[bytes],
+                 **kwargs) -> StreamingResponse:
+    """Streams events encoded by server_sent_event.
+
+    Paramters
+    ---------
+    events: AsyncIterator[bytes]
+    """
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stops nginx holding events back.
+            "X-Accel-Buffering": "no"
+        },
+        **kwargs
+    )
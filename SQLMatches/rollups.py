@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from typing import Any, List, Tuple
+from sqlalchemy.sql import select, and_, or_
+
+from .resources import Sessions
+from .tables import scoreboard_total_table, match_rollup_table
+from .on_conflict import on_rollup_conflict
+
+
+async def __add(buckets: List[dict]) -> None:
+    """Adds to the daily buckets, creating missing ones.
+
+    Parameters
+    ----------
+    buckets : List[dict]
+        Totals to add per community, day & map.
+    """
+
+    query = on_rollup_conflict()
+    if query is not None:
+        await Sessions.database.execute_many(query=query, values=buckets)
+        return
+
+    # No additive upsert, sqlite's REPLACE would overwrite the bucket.
+    async with Sessions.database.transaction():
+        for bucket in buckets:
+            where = and_(
+                match_rollup_table.c.community_name ==
+                bucket["community_name"],
+                match_rollup_table.c.day == bucket["day"],
+                match_rollup_table.c.map == bucket["map"]
+            )
+
+            exists = await Sessions.database.fetch_val(
+                select([match_rollup_table.c.day]).select_from(
+                    match_rollup_table
+                ).where(where).with_for_update()
+            )
+
+            if exists is None:
+                await Sessions.database.execute(
+                    match_rollup_table.insert().values(**bucket)
+                )
+            else:
+                await Sessions.database.execute(
+                    match_rollup_table.update().where(where).values(
+                        matches=match_rollup_table.c.matches +
+                        bucket["matches"],
+                        rounds=match_rollup_table.c.rounds + bucket["rounds"]
+                    )
+                )
+
+
+async def __apply(query: Any, sign: int = 1) -> List[str]:
+    """Aggregates finished matches into daily buckets.
+
+    Parameters
+    ----------
+    query : Any
+        Select of finished matches.
+    sign : int, optional
+        -1 to remove the matches from rollups, by default 1
+
+    Returns
+    -------
+    List[str]
+        Match IDs aggregated.
+    """
+
+    match_ids = []
+    buckets = {}
+    async for row in Sessions.database.iterate(query):
+        match_ids.append(row["match_id"])
+
+        bucket = (
+            row["community_name"],
+            row["timestamp"].date(),
+            row["map"]
+        )
+
+        if bucket not in buckets:
+            buckets[bucket] = {
+                "community_name": bucket[0],
+                "day": bucket[1],
+                "map": bucket[2],
+                "matches": 0,
+                "rounds": 0
+            }
+
+        buckets[bucket]["matches"] += sign
+        buckets[bucket]["rounds"] += sign * (
+            row["team_1_score"] + row["team_2_score"]
+        )
+
+    if buckets:
+        await __add(list(buckets.values()))
+
+    return match_ids
+
+
+def __finished_matches() -> Any:
+    return select([
+        scoreboard_total_table.c.match_id,
+        scoreboard_total_table.c.community_name,
+        scoreboard_total_table.c.timestamp,
+        scoreboard_total_table.c.map,
+        scoreboard_total_table.c.team_1_score,
+        scoreboard_total_table.c.team_2_score
+    ]).select_from(scoreboard_total_table).where(
+        scoreboard_total_table.c.status == 0
+    )
+
+
+async def rollup_matches(matches: List[Tuple[str, str]],
+                         remove: bool = False) -> None:
+    """Adds finished matches to the daily rollups.
+
+    Parameters
+    ----------
+    matches : List[Tuple[str, str]]
+        List of match IDs & community names.
+    remove : bool, optional
+        Subtract the matches instead, by default False
+    """
+
+    if not matches:
+        return
+
+    await __apply(
+        __finished_matches().where(
+            or_(*[
+                and_(
+                    scoreboard_total_table.c.match_id == match_id,
+                    scoreboard_total_table.c.community_name ==
+                    community_name
+                ) for match_id, community_name in matches
+            ])
+        ),
+        sign=-1 if remove else 1
+    )
+
+
+async def backfill_rollups(community_name: str = None,
+                           chunk_size: int = 500) -> None:
+    """Rebuilds rollups from finished matches in chunks.
+
+    Parameters
+    ----------
+    community_name : str, optional
+        Only rebuild this community, by default None
+    chunk_size : int, optional
+        Matches aggregated per query, by default 500
+    """
+
+    delete_query = match_rollup_table.delete()
+    if community_name:
+        delete_query = delete_query.where(
+            match_rollup_table.c.community_name == community_name
+        )
+
+    await Sessions.database.execute(delete_query)
+
+    last_match_id = ""
+    while True:
+        query = __finished_matches().where(
+            scoreboard_total_table.c.match_id > last_match_id
+        )
+
+        if community_name:
+            query = query.where(
+                scoreboard_total_table.c.community_name == community_name
+            )
+
+        match_ids = await __apply(
+            query.order_by(
+                scoreboard_total_table.c.match_id.asc()
+            ).limit(chunk_size)
+        )
+
+        if not match_ids:
+            break
+
+        last_match_id = match_ids[-1]
@@ -24,17 +24,19 @@ DEALINGS IN THE SOFTWARE.
 import socketio
 
 from starlette.routing import Route, Mount
-from starlette.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException
 
 from webargs_starlette import WebargsHTTPException
 
 from ..exceptions import SQLMatchesException
 from ..resources import Config, Sessions
+from ..responses import SocketIOJSON
+from ..cache_control import MapStaticFiles
 
 # Routes
 from .api.matches import (
     MatchAPI,
+    MatchEventsAPI,
     CreateMatchAPI,
     DemoUploadAPI,
     MatchesAPI
@@ -45,6 +47,8 @@ from .api.community import (
     CommunityOwnerAPI,
     CommunityCreateAPI,
     CommunityOwnerMatchesAPI,
+    CommunityOwnerRollupsAPI,
+    CommunityOwnerExportAPI,
     CommunityUpdateAPI,
     CommunityExistsAPI,
     PublicCommunityAPI,
@@ -58,11 +62,17 @@ from .api.communities import (
 )
 from .api.admin import (
     CommunitiesAdminAPI,
+    RollupsAdminAPI,
     AdminAPI,
-    SavePluginAPI
+    SavePluginAPI,
+    WebsocketMetricsAdminAPI
 )
 from .api.version import VersionAPI, VersionsAPI
-from .api.profile import ProfileAPI, SteamProfileCors
+from .api.profile import (
+    ProfileAPI,
+    ProfileMatchesAPI,
+    SteamProfileCors
+)
 from .api.server import ServerAPI, ServersAPI
 from .api.auto_setup import AutoSetupAPI
 
@@ -88,6 +98,11 @@ from .errors import (
 )
 
 
+# What AsyncServer's json param does, packets are shared
+# by every server so it's only set once.
+socketio.packet.Packet.json = SocketIOJSON
+
+
 ERROR_HANDLERS = {
     WebargsHTTPException: payload_error,
     HTTPException: server_error,
@@ -102,12 +117,14 @@ ROUTES = [
             Route("/validate", SteamValidate),
             Route("/logout", SteamLogout)
         ]),
-        Mount("/maps/", StaticFiles(directory=Config.maps_dir), name="maps"),
+        Mount("/maps/", MapStaticFiles(directory=Config.maps_dir),
+              name="maps"),
         Route("/matches/", MatchesAPI),  # Tested - POST @ 0.2.0
         Mount("/match", routes=[
             Route("/create/", CreateMatchAPI),  # Tested - POST @ 0.2.0
             Mount("/{match_id}", routes=[
                 Route("/", MatchAPI),  # Tested - GET, POST, DELETE @ 0.2.0
+                Route("/events/", MatchEventsAPI),
                 Route("/upload/", DemoUploadAPI),
                 Route("/download/", DownloadPage, name="DownloadPage")
             ])
@@ -115,6 +132,7 @@ ROUTES = [
         Route("/players/", CommunityPlayersAPI),
         Mount("/profile/{steam_id}", routes=[
             Route("/cros/", SteamProfileCors),
+            Route("/matches/", ProfileMatchesAPI),
             Route("/", ProfileAPI)
         ]),
         Mount("/version", routes=[
@@ -128,6 +146,8 @@ ROUTES = [
             Mount("/owner", routes=[
                 Route("/", CommunityOwnerAPI),
                 Route("/matches/", CommunityOwnerMatchesAPI),
+                Route("/rollups/", CommunityOwnerRollupsAPI),
+                Route("/export/", CommunityOwnerExportAPI),
                 Route("/update/", CommunityUpdateAPI),
                 Route("/stripe-session/", CommunitySessionAPI),
                 Route("/autosetup/", AutoSetupAPI)
@@ -143,7 +163,9 @@ ROUTES = [
         ]),
         Mount("/admin", routes=[
             Route("/communities/", CommunitiesAdminAPI),
+            Route("/rollups/", RollupsAdminAPI),
             Route("/plugins/", SavePluginAPI),
+            Route("/websocket/", WebsocketMetricsAdminAPI),
             Route("/", AdminAPI)
         ]),
         Route("/schema/", SchemaAPI, include_in_schema=False)
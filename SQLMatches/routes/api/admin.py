@@ -36,8 +36,16 @@ from webargs_starlette import use_args
 from ...responses import response, error_response
 from ...resources import Config, Sessions
 from ...communities import ban_communities
-from ...caches import CommunitiesCache, VersionCache, VersionsCache
+from ...caches import (
+    CommunitiesCache,
+    ListingsCache,
+    VersionCache,
+    VersionsCache
+)
 from ...misc import bulk_community_expire
+from ...cache_control import purge, community_key, VERSIONS_KEY
+from ...rollups import backfill_rollups
+from ...broadcast import cluster_metrics
 from ...version import Version
 
 
@@ -59,7 +67,12 @@ class CommunitiesAdminAPI(HTTPEndpoint):
 
         await ban_communities(**parameters)
 
-        await CommunitiesCache().expire()
+        await CommunitiesCache().invalidate()
+        await ListingsCache().invalidate()
+
+        await purge(*[
+            community_key(community) for community in parameters["communities"]
+        ])
 
         return response(background=BackgroundTask(
             bulk_community_expire,
@@ -67,6 +80,29 @@ class CommunitiesAdminAPI(HTTPEndpoint):
         ))
 
 
+class RollupsAdminAPI(HTTPEndpoint):
+    @use_args({"community_name": fields.String(max=32),
+               "chunk_size": fields.Int(missing=500)})
+    @requires("root_login")
+    async def post(self, request: Request, parameters: dict) -> response:
+        """Used to rebuild the daily rollups in the background.
+
+        Parameters
+        ----------
+        request : Request
+        parameters : dict
+
+        Returns
+        -------
+        response
+        """
+
+        return response(background=BackgroundTask(
+            backfill_rollups,
+            **parameters
+        ))
+
+
 class SavePluginAPI(HTTPEndpoint):
     @use_args({"zip_url": fields.Url(required=True)})
     @requires("root_login")
@@ -105,6 +141,25 @@ class SavePluginAPI(HTTPEndpoint):
             return response("Files unzipped and cached")
 
 
+class WebsocketMetricsAdminAPI(HTTPEndpoint):
+    @requires("root_login")
+    async def get(self, request: Request) -> response:
+        """Used to get websocket metrics of every worker
+        by worker ID & their total, workers share theirs
+        every METRICS_INTERVAL when redis is used.
+
+        Parameters
+        ----------
+        request : Request
+
+        Returns
+        -------
+        response
+        """
+
+        return response(await cluster_metrics())
+
+
 class AdminAPI(HTTPEndpoint):
     @use_args({"major": fields.Int(required=True),
                "minor": fields.Int(required=True),
@@ -138,4 +193,6 @@ class AdminAPI(HTTPEndpoint):
 
         await VersionsCache().expire()
 
+        await purge(VERSIONS_KEY)
+
         return response()
@@ -25,14 +25,18 @@ from starlette.endpoints import HTTPEndpoint
 from starlette.authentication import requires
 from starlette.requests import Request
 
+from marshmallow import validate
 from webargs import fields
 from webargs_starlette import use_args
 
 from ...responses import response
+from ...resources import Config
 
 from ...communities import communities, matches
 
-from ...caches import CommunitiesCache
+from ...caches import CommunitiesCache, ListingsCache
+
+from ...community.models import MatchModel
 
 
 class CommunitiesAPI(HTTPEndpoint):
@@ -52,17 +56,28 @@ class CommunitiesAPI(HTTPEndpoint):
         response
         """
 
-        data = [
-            community.api_schema async for community, _ in
-            communities(**parameters)
-        ]
+        async def compute() -> list:
+            return [
+                community.api_schema async for community, _ in
+                communities(**parameters)
+            ]
 
-        return response(data)
+        return await ListingsCache().listing(communities, parameters).response(
+            compute,
+            ttl=Config.cache_hard_ttl,
+            soft_ttl=Config.cache_soft_ttl
+        )
 
 
 class CommunityMatchesAPI(HTTPEndpoint):
     @use_args({"search": fields.Str(), "page": fields.Int(),
-               "desc": fields.Bool()})
+               "desc": fields.Bool(),
+               "fields": fields.List(
+                   fields.Str(validate=validate.OneOf(
+                       MatchModel.schema_fields
+                   )),
+                   validate=validate.Length(min=1)
+               )})
     @requires("steam_login")
     async def post(self, request: Request, parameters: dict) -> response:
         """Used to get matches outside of community context.
@@ -76,12 +91,17 @@ class CommunityMatchesAPI(HTTPEndpoint):
         -------
         """
 
-        data = [
-            match.api_schema async for match, _ in
-            matches(**parameters)
-        ]
+        async def compute() -> list:
+            return [
+                match.api_schema async for match, _ in
+                matches(**parameters)
+            ]
 
-        return response(data)
+        return await ListingsCache().listing(matches, parameters).response(
+            compute,
+            ttl=Config.cache_hard_ttl,
+            soft_ttl=Config.cache_soft_ttl
+        )
 
 
 class MatchesCommunitiesAPI(HTTPEndpoint):
@@ -100,30 +120,30 @@ class MatchesCommunitiesAPI(HTTPEndpoint):
         response
         """
 
-        data = {}
-
-        cache = CommunitiesCache()
-        matches_cache = cache.matches()
-
-        cache_get = await cache.get()
-        if cache_get:
-            data["communities"] = cache_get
-        else:
-            data["communities"] = [
+        async def compute_communities() -> list:
+            return [
                 community.api_schema async for community, _ in
                 communities()
             ]
 
-            await cache.set(data["communities"])
-
-        matches_cache_get = await matches_cache.get()
-        if matches_cache_get:
-            data["matches"] = matches_cache_get
-        else:
-            data["matches"] = [
+        async def compute_matches() -> list:
+            return [
                 match.api_schema async for match, _ in matches()
             ]
 
-            await matches_cache.set(data["matches"])
+        cache = CommunitiesCache()
 
-        return response(data)
+        return response({
+            "communities": await cache.get_or_compute(
+                compute_communities,
+                ttl=Config.cache_hard_ttl,
+                soft_ttl=Config.cache_soft_ttl,
+                lock=True
+            ),
+            "matches": await (cache.matches()).get_or_compute(
+                compute_matches,
+                ttl=Config.cache_hard_ttl,
+                soft_ttl=Config.cache_soft_ttl,
+                lock=True
+            )
+        })
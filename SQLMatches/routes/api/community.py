@@ -25,20 +25,36 @@ from starlette.endpoints import HTTPEndpoint
 from starlette.authentication import requires
 from starlette.requests import Request
 from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
 
+from datetime import date, timedelta
+
+from marshmallow import validate
 from webargs import fields
 from webargs_starlette import use_args
 
-from ...misc import bulk_scoreboard_expire
-
 from ...community import create_community, get_community_from_owner
-from ...exceptions import InvalidCommunity, NoOwnership
+from ...exceptions import NoOwnership
 
-from ...responses import response
+from ...responses import response, stream_response
 
-from ...resources import Config, Sessions
+from ...resources import Config
+from ...cache_control import (
+    cache_control,
+    purge,
+    community_key,
+    match_key
+)
 
-from ...caches import CommunityCache, CommunitiesCache
+from ...caches import (
+    CacheBase,
+    CommunityCache,
+    CommunitiesCache,
+    ListingsCache,
+    ApiKeyCache
+)
+
+from ...broadcast import community_update
 
 
 class PublicCommunityAPI(HTTPEndpoint):
@@ -55,10 +71,14 @@ class PublicCommunityAPI(HTTPEndpoint):
         response
         """
 
-        return response(
-            (
-                await request.state.community.public()
-            ).api_schema
+        return cache_control(
+            response(
+                (
+                    await request.state.community.public()
+                ).api_schema
+            ),
+            Config.browser_max_age,
+            keys=[community_key(request.state.community.community_name)]
         )
 
 
@@ -105,34 +125,26 @@ class CommunityOwnerAPI(HTTPEndpoint):
         request : Request
         """
 
-        data = {}
+        async def compute_community() -> dict:
+            return (await request.state.community.get()).api_schema
+
+        async def compute_stats() -> dict:
+            return (await request.state.community.stats()).api_schema
 
         cache = CommunityCache(request.state.community.community_name)
-        cache_get = await cache.get()
-        if cache_get:
-            data["community"] = cache_get
-        else:
-            try:
-                community = await request.state.community.get()
-            except InvalidCommunity:
-                raise
-            else:
-                data["community"] = community.api_schema
-
-                await cache.set(data["community"])
-
-        stats_cache = cache.stats()
-        stats_cache_get = await stats_cache.get()
-        if stats_cache_get:
-            data["stats"] = stats_cache_get
-        else:
-            data["stats"] = (
-                await request.state.community.stats()
-            ).api_schema
-
-            await stats_cache.set(data["stats"])
-
-        return response(data)
+
+        return response({
+            "community": await cache.get_or_compute(
+                compute_community,
+                ttl=Config.cache_hard_ttl,
+                soft_ttl=Config.cache_soft_ttl
+            ),
+            "stats": await (cache.stats()).get_or_compute(
+                compute_stats,
+                ttl=Config.cache_hard_ttl,
+                soft_ttl=Config.cache_soft_ttl
+            )
+        })
 
     @requires("is_owner")
     async def delete(self, request: Request) -> response:
@@ -147,11 +159,12 @@ class CommunityOwnerAPI(HTTPEndpoint):
 
         await (CommunityCache(
             request.state.community.community_name
-        )).expire()
+        )).invalidate()
 
-        communities_cache = CommunitiesCache()
-        await communities_cache.expire()
-        await (communities_cache.matches()).expire()
+        await CommunitiesCache().invalidate()
+        await ListingsCache().invalidate()
+
+        await purge(community_key(request.state.community.community_name))
 
         return response()
 
@@ -164,8 +177,12 @@ class CommunityOwnerAPI(HTTPEndpoint):
         request : Request
         """
 
+        api_key = await request.state.community.regenerate_master()
+
+        await (ApiKeyCache(api_key).missing()).expire()
+
         return response({
-            "master_api_key": await request.state.community.regenerate_master()
+            "master_api_key": api_key
         })
 
 
@@ -181,6 +198,9 @@ class CommunityUpdateAPI(HTTPEndpoint):
         await request.state.community.update(**parameters)
 
         await (CommunityCache(request.state.community.community_name)).expire()
+        await ListingsCache().invalidate()
+
+        await purge(community_key(request.state.community.community_name))
 
         return response()
 
@@ -204,16 +224,89 @@ class CommunityOwnerMatchesAPI(HTTPEndpoint):
         await request.state.community.delete_matches(**parameters)
 
         cache = CommunityCache(request.state.community.community_name)
-        await (cache.matches()).expire()
-        await cache.expire()
+        await cache.invalidate()
+
+        # Finished flags outlive the generation.
+        await CacheBase.multi_expire([
+            cache.finished(match) for match in parameters["matches"]
+        ])
 
         await (CommunitiesCache().matches()).expire()
 
-        return response(background=BackgroundTask(
-            bulk_scoreboard_expire,
-            community_name=request.state.community.community_name,
-            matches=parameters["matches"]
-        ))
+        await ListingsCache().invalidate()
+        await ListingsCache(
+            request.state.community.community_name
+        ).invalidate()
+
+        await purge(*[match_key(match) for match in parameters["matches"]])
+
+        return response()
+
+
+class CommunityOwnerRollupsAPI(HTTPEndpoint):
+    @use_args({"days": fields.Int(missing=30,
+                                  validate=validate.Range(1, 365)),
+               "map_name": fields.Str(max=24)})
+    @requires("is_owner")
+    async def post(self, request: Request, parameters: dict) -> response:
+        """Used to get match trends from the daily rollups.
+
+        Parameters
+        ----------
+        request : Request
+        parameters : dict
+
+        Returns
+        -------
+        response
+        """
+
+        since = date.today() - timedelta(days=parameters["days"] - 1)
+
+        return response({
+            "days": [
+                rollup.api_schema async for rollup in
+                request.state.community.daily_rollups(
+                    since, parameters.get("map_name")
+                )
+            ],
+            "maps": [
+                rollup.api_schema async for rollup in
+                request.state.community.map_rollups(since)
+            ]
+        })
+
+
+class CommunityOwnerExportAPI(HTTPEndpoint):
+    @use_args({"ndjson": fields.Bool(missing=False)})
+    @requires("is_owner")
+    async def post(self, request: Request, parameters: dict
+                   ) -> StreamingResponse:
+        """Used to export every match, streamed as it's read.
+
+        Parameters
+        ----------
+        request : Request
+        parameters : dict
+
+        Returns
+        -------
+        StreamingResponse
+        """
+
+        return stream_response(
+            (
+                match.api_schema async for match in
+                request.state.community.export_matches()
+            ),
+            parameters["ndjson"],
+            headers={
+                "Content-Disposition": "attachment; filename={}{}".format(
+                    request.state.community.community_name,
+                    ".ndjson" if parameters["ndjson"] else ".json"
+                )
+            }
+        )
 
 
 class CommunityCreateAPI(HTTPEndpoint):
@@ -237,16 +330,14 @@ class CommunityCreateAPI(HTTPEndpoint):
             **parameters
         )
 
-        await Sessions.websocket.emit(
-            "community_updates",
-            model.api_schema,
-            room="ws_room"
-        )
+        await community_update(model.api_schema)
 
         await CommunityCache(parameters["community_name"]).set(
             model.api_schema
         )
         await CommunitiesCache().expire()
+        await ListingsCache().invalidate()
+        await (ApiKeyCache(model.master_api_key).missing()).expire()
 
         return response(model.api_schema, background=BackgroundTask(
             community.email,
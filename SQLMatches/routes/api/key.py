@@ -29,6 +29,7 @@ from webargs import fields
 from webargs_starlette import use_args
 
 from ...responses import response
+from ...caches import ApiKeyCache
 
 
 class KeyAPI(HTTPEndpoint):
@@ -47,10 +48,14 @@ class KeyAPI(HTTPEndpoint):
         response
         """
 
+        api_key = await (
+            request.state.community.key(**parameters)
+        ).regenerate()
+
+        await (ApiKeyCache(api_key).missing()).expire()
+
         return response({
-            "api_key": await (
-                request.state.community.key(**parameters)
-            ).regenerate()
+            "api_key": api_key
         })
 
     @requires(["community", "steam_login"])
@@ -91,6 +96,8 @@ class KeyAPI(HTTPEndpoint):
             request.session["steam_id"]
         )
 
+        await (ApiKeyCache(key).missing()).expire()
+
         return response({
             "api_key": key
         })
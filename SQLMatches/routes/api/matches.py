@@ -31,11 +31,20 @@ from webargs import fields
 from webargs_starlette import use_args
 
 from ...webhook_pusher import WebhookPusher
-from ...responses import response
+from ...responses import (
+    response,
+    error_response,
+    if_none_match,
+    not_modified,
+    event_stream
+)
 from ...resources import Sessions, Config
 from ...demos import Demo
-from ...caches import CommunityCache, CommunitiesCache
-from ...exceptions import InvalidMatchID, DemoAlreadyUploaded
+from ...caches import CommunityCache, CommunitiesCache, ListingsCache
+from ...cache_control import cache_control, purge, match_key, community_key
+from ...broadcast import match_update, match_events, match_room, snapshot
+from ...exceptions import InvalidMatchID, DemoAlreadyUploaded, DemoTooLarge
+from ...community.models import MatchModel
 
 
 class PlayersSchema(Schema):
@@ -65,26 +74,48 @@ class MatchAPI(HTTPEndpoint):
         request : Request
         """
 
-        cache = CommunityCache(
-            request.state.community.community_name
-        ).scoreboard(request.path_params["match_id"])
-
-        cache_get = await cache.get()
-        if cache_get:
-            return response(cache_get)
+        cache = CommunityCache(request.state.community.community_name)
+        finished = cache.finished(request.path_params["match_id"])
 
-        try:
+        async def compute() -> dict:
             scoreboard = await request.state.community.match(
                 request.path_params["match_id"]
             ).scoreboard()
-        except InvalidMatchID:
-            raise
-        else:
-            data = scoreboard.api_schema
 
-            await cache.set(data)
+            if scoreboard.status == 0:
+                await finished.flag()
+
+            return scoreboard.api_schema
 
-            return response(data)
+        missing = cache.missing_match(request.path_params["match_id"])
+        if await missing.missed():
+            raise InvalidMatchID()
+
+        etag = await (cache.scoreboard_version(
+            request.path_params["match_id"]
+        )).etag()
+        if if_none_match(request, etag):
+            resp = not_modified(etag)
+        else:
+            try:
+                resp = await cache.scoreboard(
+                    request.path_params["match_id"]
+                ).response(compute, lock=True)
+            except InvalidMatchID:
+                await missing.miss()
+                raise
+
+            resp.headers["ETag"] = etag
+
+        # Live matches are revalidated every time.
+        return cache_control(
+            resp,
+            Config.browser_max_age if await finished.flagged() else 0,
+            keys=[
+                match_key(request.path_params["match_id"]),
+                community_key(request.state.community.community_name)
+            ]
+        )
 
     @use_args({"team_1_score": fields.Int(required=True,
                                           validates=validate.Range(0, 240)),
@@ -118,24 +149,37 @@ class MatchAPI(HTTPEndpoint):
             scoreboard = await match.scoreboard()
             data = scoreboard.api_schema
 
-            await ((CommunitiesCache()).matches()).expire()
+            await ((CommunitiesCache()).matches()).stale(
+                Config.cache_hard_ttl
+            )
+
+            if parameters.get("end"):
+                await ListingsCache().invalidate()
+
+            await ListingsCache(
+                request.state.community.community_name
+            ).invalidate()
 
             cache = CommunityCache(request.state.community.community_name)
-            await (cache.matches()).expire()
             await (cache.scoreboard(request.path_params["match_id"])).set(
                 data
             )
+            version = await (cache.scoreboard_version(
+                request.path_params["match_id"]
+            )).bump()
 
-            await Sessions.websocket.emit(
-                "match_update",
-                data,
-                room="ws_room"
-            )
+            if parameters.get("end"):
+                await (cache.finished(
+                    request.path_params["match_id"]
+                )).flag()
 
-            await Sessions.websocket.emit(
+            await purge(match_key(request.path_params["match_id"]))
+
+            await match_update(
+                request.state.community.community_name,
                 request.path_params["match_id"],
                 data,
-                room="ws_room"
+                version
             )
 
             pusher = WebhookPusher(
@@ -176,24 +220,33 @@ class MatchAPI(HTTPEndpoint):
             else:
                 data = scoreboard.api_schema
 
-                await ((CommunitiesCache()).matches()).expire()
+                await ((CommunitiesCache()).matches()).stale(
+                    Config.cache_hard_ttl
+                )
+
+                await ListingsCache().invalidate()
+                await ListingsCache(
+                    request.state.community.community_name
+                ).invalidate()
 
                 cache = CommunityCache(request.state.community.community_name)
-                await (cache.matches()).expire()
                 await (cache.scoreboard(request.path_params["match_id"])).set(
                     data
                 )
+                version = await (cache.scoreboard_version(
+                    request.path_params["match_id"]
+                )).bump()
+                await (cache.finished(
+                    request.path_params["match_id"]
+                )).flag()
 
-                await Sessions.websocket.emit(
-                    "match_update",
-                    data,
-                    room="ws_room"
-                )
+                await purge(match_key(request.path_params["match_id"]))
 
-                await Sessions.websocket.emit(
+                await match_update(
+                    request.state.community.community_name,
                     request.path_params["match_id"],
                     data,
-                    room="ws_room"
+                    version
                 )
 
                 return response(
@@ -208,12 +261,51 @@ class MatchAPI(HTTPEndpoint):
             return response()
 
 
+class MatchEventsAPI(HTTPEndpoint):
+    @requires("community")
+    async def get(self, request: Request) -> event_stream:
+        """Streams a scoreboard_snapshot then the same scoreboard
+        events sockets in the match's room are sent.
+
+        Parameters
+        ----------
+        request : Request
+        """
+
+        # Listening first, so nothing after the snapshot is missed.
+        listener = Sessions.websocket.listen(
+            match_room(request.path_params["match_id"])
+        )
+
+        try:
+            data = await snapshot(
+                request.state.community.community_name,
+                request.path_params["match_id"]
+            )
+        except Exception:
+            Sessions.websocket.stop_listening(listener)
+            raise
+
+        if data is None:
+            Sessions.websocket.stop_listening(listener)
+            raise InvalidMatchID()
+
+        return event_stream(match_events(listener, data))
+
+
 class MatchesAPI(HTTPEndpoint):
     @use_args({"search": fields.Str(), "page": fields.Int(),
-               "desc": fields.Bool(), "require_scoreboard": fields.Bool()})
+               "desc": fields.Bool(), "require_scoreboard": fields.Bool(),
+               "fields": fields.List(
+                   fields.Str(validate=validate.OneOf(
+                       MatchModel.schema_fields
+                   )),
+                   validate=validate.Length(min=1)
+               )})
     @requires("community")
     async def post(self, request: Request, parameters: dict) -> response:
-        """Used to list matches.
+        """Used to list matches, fields selects what's
+        returned of each match.
 
         Parameters
         ----------
@@ -221,28 +313,28 @@ class MatchesAPI(HTTPEndpoint):
         parameters : dict
         """
 
-        if not parameters:
-            cache = CommunityCache(
-                request.state.community.community_name
-            ).matches()
-
-            cache_get = await cache.get()
-            if cache_get:
-                return response(cache_get)
-
-            data = [
+        async def compute() -> list:
+            return [
                 match.api_schema async for match, _ in
                 request.state.community.matches(**parameters)
             ]
 
-            await cache.set(data)
-        else:
-            data = [
-                match.api_schema async for match, _ in
-                request.state.community.matches(**parameters)
-            ]
+        listing = ListingsCache(
+            request.state.community.community_name
+        ).listing(request.state.community.matches, parameters)
 
-        return response(data)
+        etag = await listing.etag()
+        if if_none_match(request, etag):
+            return not_modified(etag)
+
+        resp = await listing.response(
+            compute,
+            ttl=Config.cache_hard_ttl,
+            soft_ttl=Config.cache_soft_ttl
+        )
+        resp.headers["ETag"] = etag
+
+        return resp
 
 
 class CreateMatchAPI(HTTPEndpoint):
@@ -269,9 +361,14 @@ class CreateMatchAPI(HTTPEndpoint):
 
         data, match = await request.state.community.create_match(**parameters)
 
-        await (CommunityCache(
+        await CommunityCache(
+            request.state.community.community_name
+        ).missing_match(match.match_id).expire()
+
+        await ListingsCache().invalidate()
+        await ListingsCache(
             request.state.community.community_name
-        ).matches()).expire()
+        ).invalidate()
 
         return response(
             {"match_id": match.match_id},
@@ -310,11 +407,10 @@ class DemoUploadAPI(HTTPEndpoint):
 
             await match.set_demo_status(1)
 
-            if await demo.upload():
-                background_task = None
-
-                await match.set_demo_status(2)
-            else:
+            try:
+                await demo.upload()
+            except DemoTooLarge as error:
+                too_large = error
                 background_task = BackgroundTask(
                     request.state.community.email,
                     title="SQLMatches.com, upload failed.",
@@ -332,26 +428,38 @@ class DemoUploadAPI(HTTPEndpoint):
                 )
 
                 await match.set_demo_status(3)
+            else:
+                too_large = None
+                background_task = None
+
+                await match.set_demo_status(2)
 
             scoreboard = await match.scoreboard()
             data = scoreboard.api_schema
 
-            await (CommunityCache(
-                match.community_name
-            ).scoreboard(request.path_params["match_id"])).set(
+            cache = CommunityCache(match.community_name)
+            await (cache.scoreboard(request.path_params["match_id"])).set(
                 data
             )
+            version = await (cache.scoreboard_version(
+                request.path_params["match_id"]
+            )).bump()
+            await ListingsCache(match.community_name).invalidate()
 
-            await Sessions.websocket.emit(
-                "match_update",
-                data,
-                room="ws_room"
-            )
+            await purge(match_key(request.path_params["match_id"]))
 
-            await Sessions.websocket.emit(
+            await match_update(
+                match.community_name,
                 request.path_params["match_id"],
                 data,
-                room="ws_room"
+                version
             )
 
+            if too_large:
+                return error_response(
+                    str(too_large),
+                    status_code=413,
+                    background=background_task
+                )
+
             return response(background=background_task)
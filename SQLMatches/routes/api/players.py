@@ -25,18 +25,46 @@ from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
 from starlette.authentication import requires
 
+from marshmallow import validate
 from webargs import fields
 from webargs_starlette import use_args
 
-from ...responses import response
+from ...responses import response, if_none_match, not_modified
+from ...resources import Config
+from ...caches import ListingsCache
+from ...community.models import ProfileOverviewModel
 
 
 class CommunityPlayersAPI(HTTPEndpoint):
     @use_args({"search": fields.Str(), "page": fields.Int(),
-               "desc": fields.Bool()})
+               "desc": fields.Bool(),
+               "fields": fields.List(
+                   fields.Str(validate=validate.OneOf(
+                       ProfileOverviewModel.schema_fields
+                   )),
+                   validate=validate.Length(min=1)
+               )})
     @requires("community")
     async def post(self, request: Request, paramters: dict) -> response:
-        return response([
-            player.api_schema async for player in
-            request.state.community.players(**paramters)
-        ])
+        async def compute() -> list:
+            return [
+                player.api_schema async for player in
+                request.state.community.players(**paramters)
+            ]
+
+        listing = ListingsCache(
+            request.state.community.community_name
+        ).listing(request.state.community.players, paramters)
+
+        etag = await listing.etag()
+        if if_none_match(request, etag):
+            return not_modified(etag)
+
+        resp = await listing.response(
+            compute,
+            ttl=Config.cache_hard_ttl,
+            soft_ttl=Config.cache_soft_ttl
+        )
+        resp.headers["ETag"] = etag
+
+        return resp
@@ -29,10 +29,14 @@ from starlette.responses import (
     Response
 )
 
+from webargs import fields
+from webargs_starlette import use_args
+
 from ...responses import response
 from ...resources import Sessions
 
-from ...caches import CommunityCache
+from ...caches import CommunityCache, ListingsCache
+from ...exceptions import InvalidSteamID
 
 
 class SteamProfileCors(HTTPEndpoint):
@@ -71,10 +75,45 @@ class ProfileAPI(HTTPEndpoint):
         if cache_get:
             return response(cache_get)
 
-        data = (await request.state.community.profile(
-            request.path_params["steam_id"]
-        )).api_schema
+        missing = ListingsCache(
+            request.state.community.community_name
+        ).missing_player(request.path_params["steam_id"])
+        if await missing.missed():
+            raise InvalidSteamID()
+
+        try:
+            data = (await request.state.community.profile(
+                request.path_params["steam_id"]
+            )).api_schema
+        except InvalidSteamID:
+            await missing.miss()
+            raise
 
         await cache.set(data, ttl=30)
 
         return response(data)
+
+
+class ProfileMatchesAPI(HTTPEndpoint):
+    @use_args({"page": fields.Int(), "desc": fields.Bool()})
+    @requires("community")
+    async def post(self, request: Request, parameters: dict) -> response:
+        """Lists matches of a community player.
+
+        Parameters
+        ----------
+        request : Request
+        parameters : dict
+
+        Returns
+        -------
+        response
+        """
+
+        return response([
+            match.api_schema async for match, _ in
+            request.state.community.player_matches(
+                request.path_params["steam_id"],
+                **parameters
+            )
+        ])
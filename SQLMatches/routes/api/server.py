@@ -24,42 +24,53 @@ from starlette.endpoints import HTTPEndpoint
 from starlette.authentication import requires
 from starlette.requests import Request
 
+from marshmallow import validate
 from webargs import fields
 from webargs_starlette import use_args
 
 from ...responses import response
 from ...caches import ServerCache, ServersCache
-from ...resources import Sessions
+from ...resources import Config
+from ...exceptions import InvalidServer
+from ...community.models import ServerModel
+from ...broadcast import server_update
 
 
 class ServersAPI(HTTPEndpoint):
+    @use_args({"fields": fields.DelimitedList(
+        fields.Str(validate=validate.OneOf(ServerModel.schema_fields)),
+        validate=validate.Length(min=1)
+    )}, location="query")
     @requires("community")
-    async def get(self, request: Request) -> response:
-        """Used to list servers.
+    async def get(self, request: Request, parameters: dict) -> response:
+        """Used to list servers, ?fields=ip,port selects
+        what's returned of each server.
 
         Parameters
         ----------
         request : Request
+        parameters : dict
 
         Returns
         -------
         response
         """
 
-        cache = ServersCache(request.state.community.community_name)
-        cache_get = await cache.get()
+        async def compute() -> list:
+            return [
+                server.api_schema async for server, _
+                in request.state.community.servers(**parameters)
+            ]
 
-        if cache_get:
-            return response(cache_get)
-
-        data = [
-            server.api_schema async for server, _
-            in request.state.community.servers()
-        ]
-
-        await cache.set(data)
+        cache = ServersCache(request.state.community.community_name)
+        if "fields" in parameters:
+            cache = cache.sparse(parameters["fields"])
 
-        return response(data)
+        return await cache.response(
+            compute,
+            ttl=Config.cache_hard_ttl,
+            soft_ttl=Config.cache_soft_ttl
+        )
 
     @use_args({"ip": fields.String(min=1, max=15, required=True),
                "port": fields.Integer(required=True),
@@ -72,17 +83,18 @@ class ServersAPI(HTTPEndpoint):
             parameters["ip"], parameters["port"]
         ).set(model.api_schema)
 
-        await ServersCache(request.state.community.community_name).expire()
+        cache = ServersCache(request.state.community.community_name)
+        await cache.expire()
+        await (cache.missing(parameters["ip"], parameters["port"])).expire()
 
-        await Sessions.websocket.emit(
+        await server_update(
             request.state.community.community_name,
             {
                 "ip": parameters["ip"],
                 "port": parameters["port"],
                 "data": model.api_schema,
                 "state": "add"
-            },
-            room="ws_room"
+            }
         )
 
         return response(model.api_schema)
@@ -110,9 +122,19 @@ class ServerAPI(HTTPEndpoint):
         if cache_get:
             return response(cache_get)
 
-        data = (
-            await (request.state.community.server(ip, port)).get()
-        ).api_schema
+        missing = ServersCache(
+            request.state.community.community_name
+        ).missing(ip, port)
+        if await missing.missed():
+            raise InvalidServer()
+
+        try:
+            data = (
+                await (request.state.community.server(ip, port)).get()
+            ).api_schema
+        except InvalidServer:
+            await missing.miss()
+            raise
 
         await cache.set(data)
 
@@ -145,17 +167,18 @@ class ServerAPI(HTTPEndpoint):
         data = (await server.get()).api_schema
 
         await ServerCache(ip, port).set(data)
-        await ServersCache(request.state.community.community_name).expire()
+        await ServersCache(request.state.community.community_name).stale(
+            Config.cache_hard_ttl
+        )
 
-        await Sessions.websocket.emit(
+        await server_update(
             request.state.community.community_name,
             {
                 "ip": ip,
                 "port": port,
                 "data": data,
                 "state": "update"
-            },
-            room="ws_room"
+            }
         )
 
         return response()
@@ -180,14 +203,13 @@ class ServerAPI(HTTPEndpoint):
         await ServerCache(ip, port).expire()
         await ServersCache(request.state.community.community_name).expire()
 
-        await Sessions.websocket.emit(
+        await server_update(
             request.state.community.community_name,
             {
                 "ip": ip,
                 "port": port,
                 "state": "delete"
-            },
-            room="ws_room"
+            }
         )
 
         return response()
@@ -24,9 +24,10 @@ from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
 
 from ...responses import response
+from ...resources import Config
+from ...cache_control import cache_control, VERSIONS_KEY
 from ...caches import VersionCache, VersionsCache
 from ...version import Version, versions
-from ...exceptions import InvalidVersion
 
 
 class VersionAPI(HTTPEndpoint):
@@ -44,23 +45,23 @@ class VersionAPI(HTTPEndpoint):
             request.path_params["patch"]
         )
         cache_get = await cache.get()
-        if cache_get:
-            return response(cache_get)
-
-        try:
-            message = await Version(
-                request.path_params["major"],
-                request.path_params["minor"],
-                request.path_params["patch"]
-            ).get()
-        except InvalidVersion:
-            raise
-        else:
-            data = {"message": message}
-
-            await cache.set(data)
-
-            return response(data)
+        if not cache_get:
+            cache_get = {
+                "message": await Version(
+                    request.path_params["major"],
+                    request.path_params["minor"],
+                    request.path_params["patch"]
+                ).get()
+            }
+
+            await cache.set(cache_get)
+
+        return cache_control(
+            response(cache_get),
+            Config.browser_max_age,
+            public=True,
+            keys=[VERSIONS_KEY]
+        )
 
 
 class VersionsAPI(HTTPEndpoint):
@@ -78,14 +79,17 @@ class VersionsAPI(HTTPEndpoint):
 
         cache = VersionsCache()
         cache_get = await cache.get()
-        if cache_get:
-            return response(cache_get)
-
-        data = [
-            {"message": message, "version": version}
-            async for message, version, _ in versions()
-        ]
-
-        await cache.set(data)
-
-        return response(data)
+        if not cache_get:
+            cache_get = [
+                {"message": message, "version": version}
+                async for message, version, _ in versions()
+            ]
+
+            await cache.set(cache_get)
+
+        return cache_control(
+            response(cache_get),
+            Config.browser_max_age,
+            public=True,
+            keys=[VERSIONS_KEY]
+        )
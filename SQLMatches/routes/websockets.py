@@ -20,23 +20,119 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+
 from ..resources import Sessions
+from ..broadcast import (
+    GLOBAL_ROOM,
+    MAX_SUBSCRIPTIONS,
+    match_room,
+    community_room,
+    send_snapshot
+)
+
+
+def _room(data: dict) -> str:
+    """Room a subscribe or unsubscribe event is for.
+
+    Parameters
+    ----------
+    data : dict
+        {"match_id": str, "community_name": str},
+        {"community_name": str} or {} for the global feed.
+
+    Returns
+    -------
+    str
+        None if data is invalid.
+    """
+
+    if not isinstance(data, dict):
+        return None
+
+    for key, max_length, room in (("match_id", 36, match_room),
+                                  ("community_name", 32, community_room)):
+        if key in data:
+            value = data[key]
+            if isinstance(value, str) and 0 < len(value) <= max_length:
+                return room(value)
+
+            return None
+
+    return GLOBAL_ROOM
+
+
+def _match(data: dict) -> bool:
+    """If data names a match & its community.
+    """
+
+    return (
+        isinstance(data, dict) and "match_id" in data
+        and _room(data) is not None
+        and _room({"community_name": data.get("community_name")}) is not None
+    )
 
 
 @Sessions.websocket.event
 async def connect(sid, environ: dict):
+    Sessions.websocket.metrics.connect()
+
     if ("asgi.scope" in environ and "auth" in environ["asgi.scope"]
             and "steam_login" in environ["asgi.scope"]["auth"].scopes):
 
-        Sessions.websocket.enter_room(
-            sid,
-            "ws_room"
-        )
+        await Sessions.websocket.save_session(sid, {"steam_login": True})
 
 
 @Sessions.websocket.event
 async def disconnect(sid):
-    Sessions.websocket.leave_room(
-        sid,
-        "ws_room"
-    )
+    Sessions.websocket.metrics.disconnect()
+
+
+@Sessions.websocket.event
+async def subscribe(sid, data: dict = None) -> bool:
+    """Joins the room for a match, community or the global feed,
+    matches are sent a scoreboard_snapshot to apply patches onto.
+    """
+
+    session = await Sessions.websocket.get_session(sid)
+    if not session.get("steam_login"):
+        return False
+
+    room = _room(data if data is not None else {})
+    # Includes the room every socket is in by its sid.
+    if not room or \
+            len(Sessions.websocket.rooms(sid)) > MAX_SUBSCRIPTIONS:
+        return False
+
+    # Joined first, so no patch is missed after the snapshot.
+    Sessions.websocket.enter_room(sid, room)
+
+    if _match(data) and not await send_snapshot(
+            sid, data["community_name"], data["match_id"]):
+        Sessions.websocket.leave_room(sid, room)
+        return False
+
+    return True
+
+
+@Sessions.websocket.event
+async def resync(sid, data: dict = None) -> bool:
+    """Resends a scoreboard_snapshot, for when a patch's base
+    isn't the version a client is at.
+    """
+
+    if not _match(data) or \
+            match_room(data["match_id"]) not in Sessions.websocket.rooms(sid):
+        return False
+
+    return await send_snapshot(sid, data["community_name"], data["match_id"])
+
+
+@Sessions.websocket.event
+async def unsubscribe(sid, data: dict = None) -> bool:
+    room = _room(data if data is not None else {})
+    if not room:
+        return False
+
+    Sessions.websocket.leave_room(sid, room)
+
+    return True
@@ -20,6 +20,8 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import socketio
+
 from os import path, mkdir
 
 from .exceptions import UnSupportedEngine
@@ -207,3 +209,99 @@ class WebhookSettings:
         self.match_end = match_end
         self.round_end = round_end
         self.key = key
+
+
+class CacheSettings:
+    def __init__(self, local_size: int = 1024,
+                 local_ttl: float = 1.0, soft_ttl: float = 5.0,
+                 hard_ttl: int = 300, listing_pages: int = 5,
+                 negative_ttl: int = 30, browser_max_age: int = 60,
+                 shared_max_age: int = 86400,
+                 purge_url: str = None) -> None:
+        """Used to configure caching.
+
+        Parameters
+        ----------
+        local_size : int, optional
+            Max entries held in memory per worker, by default 1024
+        local_ttl : float, optional
+            Seconds a entry is held in memory, by default 1.0
+        soft_ttl : float, optional
+            Seconds until a API response is refreshed in the
+            background, by default 5.0
+        hard_ttl : int, optional
+            Seconds until a API response is dropped, by default 300
+        listing_pages : int, optional
+            Pages of a listing to cache, by default 5
+        negative_ttl : int, optional
+            Seconds a invalid match, player, server or API key
+            is remembered for, by default 30
+        browser_max_age : int, optional
+            Seconds browsers reuse finished matches, versions,
+            maps & public community info for, by default 60
+        shared_max_age : int, optional
+            Seconds a CDN or nginx holds public responses for,
+            relies on purge_url, by default 86400
+        purge_url : str, optional
+            Sent a PURGE request with a Surrogate-Key header
+            when tagged resources change, by default None
+        """
+
+        self.local_size = local_size
+        self.local_ttl = local_ttl
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.listing_pages = listing_pages
+        self.negative_ttl = negative_ttl
+        self.browser_max_age = browser_max_age
+        self.shared_max_age = shared_max_age
+        self.purge_url = purge_url
+
+
+class CompressionSettings:
+    def __init__(self, minimum_size: int = 500,
+                 precompress: bool = True) -> None:
+        """Used to configure response compression.
+
+        Parameters
+        ----------
+        minimum_size : int, optional
+            Bytes a body must be to be compressed, by default 500
+        precompress : bool, optional
+            Store compressed cached responses alongside them,
+            so they're compressed once per change, by default True
+        """
+
+        self.minimum_size = minimum_size
+        self.precompress = precompress
+
+
+class WebsocketSettings:
+    def __init__(self, client_manager: socketio.AsyncManager = None,
+                 channel: str = "sqlmatches-socketio",
+                 emit_window: float = 0.25,
+                 max_queued: int = 64) -> None:
+        """Used to configure websockets.
+
+        Parameters
+        ----------
+        client_manager : socketio.AsyncManager, optional
+            Shares rooms between workers, by default a
+            MeteredRedisManager if redis is running otherwise
+            workers only emit to their own sockets. Fan-out
+            is only timed for managers using MeteredFanOut.
+        channel : str, optional
+            Redis channel workers publish emits on,
+            by default "sqlmatches-socketio"
+        emit_window : float, optional
+            Seconds scoreboard updates of a match are coalesced
+            over, only the latest is sent, by default 0.25
+        max_queued : int, optional
+            Packets a socket can have waiting before emits
+            to it are skipped, 0 for no limit, by default 64
+        """
+
+        self.client_manager = client_manager
+        self.channel = channel
+        self.emit_window = emit_window
+        self.max_queued = max_queued
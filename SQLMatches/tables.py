@@ -27,11 +27,13 @@ from sqlalchemy import (
     String,
     Column,
     TIMESTAMP,
+    Date,
     ForeignKey,
     Integer,
     Boolean,
     UniqueConstraint,
     PrimaryKeyConstraint,
+    Index,
     create_engine
 )
 from datetime import datetime
@@ -503,6 +505,91 @@ scoreboard_table = Table(
 )
 
 
+# Index of matches a player has been apart of,
+# used for profile match history.
+player_match_table = Table(
+    "player_match",
+    metadata,
+    Column(
+        "steam_id",
+        String(length=64),
+        ForeignKey("user.steam_id"),
+        primary_key=True
+    ),
+    Column(
+        "match_id",
+        String(length=36),
+        ForeignKey("scoreboard_total.match_id", ondelete="CASCADE"),
+        primary_key=True
+    ),
+    Column(
+        "community_name",
+        String(length=32),
+        ForeignKey("community.community_name")
+    ),
+    Column(
+        "timestamp",
+        TIMESTAMP,
+        default=datetime.now
+    ),
+    PrimaryKeyConstraint(
+        "steam_id",
+        "match_id",
+        sqlite_on_conflict="IGNORE"
+    ),
+    Index(
+        "player_match_history",
+        "steam_id",
+        "community_name",
+        "timestamp"
+    ),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4"
+)
+
+
+# Daily aggregates of finished matches,
+# per community & map.
+match_rollup_table = Table(
+    "match_rollup",
+    metadata,
+    Column(
+        "community_name",
+        String(length=32),
+        ForeignKey("community.community_name"),
+        primary_key=True
+    ),
+    Column(
+        "day",
+        Date,
+        primary_key=True
+    ),
+    Column(
+        "map",
+        String(length=24),
+        primary_key=True
+    ),
+    Column(
+        "matches",
+        Integer,
+        default=0
+    ),
+    Column(
+        "rounds",
+        Integer,
+        default=0
+    ),
+    PrimaryKeyConstraint(
+        "community_name",
+        "day",
+        "map",
+        sqlite_on_conflict="REPLACE"
+    ),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4"
+)
+
+
 def create_tables(database_url: str) -> None:
     """ Creates tables. """
 
@@ -20,7 +20,11 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import json
+
 from aiohttp import BasicAuth
+from base64 import b64encode
+from itsdangerous import TimestampSigner
 
 from .. import SQLMatches, COMMUNITY_TYPES
 from ..settings import (
@@ -32,6 +36,7 @@ from ..settings import (
 
 from ..community import create_community, Community
 from ..exceptions import AlreadyCommunity, CommunityTaken
+from ..key_loader import KeyLoader
 
 from starlette.testclient import TestClient
 
@@ -93,5 +98,14 @@ class TestBase:
             ).encode()
         }
 
+        # Signed like starlette's SessionMiddleware after a steam login.
+        self.steam_session = {
+            "Cookie": "session={}".format(
+                TimestampSigner(KeyLoader(name="session").load()).sign(
+                    b64encode(json.dumps({"steam_id": STEAM_ID}).encode())
+                ).decode()
+            )
+        }
+
     async def tearDown(self) -> None:
         await sqlmatches._shutdown()
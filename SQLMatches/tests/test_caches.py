@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import asyncio
+import asynctest
+import json
+
+from time import monotonic, time
+
+from aiocache import Cache
+from aiojobs import create_scheduler
+from starlette.requests import Request
+
+from ..resources import Sessions, Config
+from ..responses import if_none_match
+from ..caches import (
+    LocalCache,
+    CacheBase,
+    CommunityCache,
+    ListingsCache,
+    MissCache,
+    SharedCache,
+    generation,
+    publish_invalidation,
+    handle_invalidation,
+    INVALIDATION_CHANNEL,
+    WORKER_ID
+)
+from ..background_tasks import cache_invalidator
+from ..cache_control import purge
+
+
+def request(if_none_match: str = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+
+    return Request({"type": "http", "headers": headers})
+
+
+class Redis:
+    """Records what's published, stands in for Sessions.redis.
+    """
+
+    def __init__(self) -> None:
+        self.published = []
+
+    async def publish(self, channel: str, message: str) -> None:
+        self.published.append((channel, message))
+
+
+class Channel:
+    def __init__(self, messages: list) -> None:
+        self.messages = messages
+
+    async def iter(self, encoding: str = None):
+        for message in self.messages:
+            yield message
+
+
+class Subscriber:
+    """Hands out the given messages then drops, like a lost connection.
+    """
+
+    def __init__(self, messages: list) -> None:
+        self.channel = Channel(messages)
+        self.closed = False
+
+    async def subscribe(self, channel: str) -> list:
+        return [self.channel]
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        pass
+
+
+class PurgeResponse:
+    def __init__(self) -> None:
+        self.status = 200
+        self.released = False
+
+    async def __aenter__(self) -> "PurgeResponse":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.released = True
+
+
+class HTTPSession:
+    """Records requests, stands in for Sessions.aiohttp.
+    """
+
+    def __init__(self) -> None:
+        self.requests = []
+
+    def request(self, method: str, url: str, **kwargs) -> PurgeResponse:
+        resp = PurgeResponse()
+        self.requests.append((method, url, kwargs["headers"], resp))
+
+        return resp
+
+
+class TestCaches(asynctest.TestCase):
+    use_default_loop = True
+
+    async def setUp(self) -> None:
+        # Stands in for redis shared between workers.
+        Sessions.cache = Cache(Cache.MEMORY)
+        Sessions.local_cache = LocalCache(1024, 1.0)
+        Sessions.redis = None
+
+        Config.cache_hard_ttl = 300
+        Config.negative_ttl = 30
+        Config.listing_pages = 5
+        Config.timestamp_format = "%m/%d/%Y-%H:%M:%S"
+        Sessions.scheduler = await create_scheduler()
+
+        self.computed = 0
+
+    async def tearDown(self) -> None:
+        await Sessions.cache.clear()
+        await Sessions.scheduler.close()
+
+    async def compute(self) -> int:
+        self.computed += 1
+        await asyncio.sleep(0.05)
+
+        return self.computed
+
+    async def test_concurrent_misses_computed_once(self) -> None:
+        cache = CommunityCache("TestLeague").stats()
+
+        values = await asyncio.gather(*[
+            cache.get_or_compute(self.compute) for _ in range(10)
+        ])
+
+        self.assertEqual(self.computed, 1, "Computed once")
+        self.assertEqual(values, [1] * 10, "Every caller got the value")
+        self.assertEqual(await cache.get(), 1, "Value stored")
+
+    async def test_cancelled_caller_keeps_compute(self) -> None:
+        cache = CommunityCache("TestLeague").stats()
+
+        first = asyncio.ensure_future(cache.get_or_compute(self.compute))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(cache.get_or_compute(self.compute))
+        await asyncio.sleep(0.01)
+
+        # Like the client of the first request disconnecting.
+        first.cancel()
+
+        self.assertEqual(await second, 1, "Waiter not cancelled")
+        self.assertEqual(self.computed, 1, "Compute kept running")
+
+    async def test_released_lock_not_waited_on(self) -> None:
+        cache = CommunityCache("TestLeague").stats()
+
+        # Another worker holds the lock, then fails without a value.
+        await Sessions.cache.add(
+            await cache.resolve() + "-lock", "worker", ttl=5
+        )
+
+        async def release() -> None:
+            await asyncio.sleep(0.1)
+            await Sessions.cache.delete(await cache.resolve() + "-lock")
+
+        asyncio.ensure_future(release())
+
+        started = monotonic()
+        value = await cache.get_or_compute(self.compute, lock=True)
+
+        self.assertEqual(value, 1)
+        self.assertLess(
+            monotonic() - started, 1, "Computed once the lock was released"
+        )
+
+    async def test_invalidate_changes_key(self) -> None:
+        community = CommunityCache("TestLeague")
+        cache = community.scoreboard("match")
+
+        await cache.set({"match_id": "match"})
+        key = await cache.resolve()
+
+        await community.invalidate()
+
+        self.assertNotEqual(await cache.resolve(), key, "New generation")
+        self.assertIsNone(await cache.get(), "Old value not found")
+        self.assertIsNone(
+            await CommunityCache("OtherLeague").scoreboard("match").get(),
+            "Other namespaces untouched"
+        )
+
+    async def test_multi_invalidate_seeds_generation(self) -> None:
+        started = int(time() * 1000)
+
+        # Like redis evicting the generation.
+        await CacheBase.multi_invalidate([ListingsCache("TestLeague")])
+
+        self.assertGreater(
+            await generation(ListingsCache("TestLeague").namespace),
+            started,
+            "Generation never restarts onto old keys"
+        )
+
+    async def test_soft_expired_value_refreshed(self) -> None:
+        cache = CommunityCache("TestLeague").stats()
+
+        self.assertEqual(
+            await cache.get_or_compute(self.compute, soft_ttl=0.01), 1
+        )
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(
+            await cache.get_or_compute(self.compute, soft_ttl=0.01), 1,
+            "Stale value served while refreshing"
+        )
+        await asyncio.sleep(0.1)
+        Sessions.local_cache.clear()
+
+        self.assertEqual(
+            await cache.get_or_compute(self.compute, soft_ttl=10), 2,
+            "Refreshed in the background"
+        )
+        self.assertEqual(self.computed, 2)
+
+    async def test_miss_cache(self) -> None:
+        missing = CommunityCache("TestLeague").missing_match("match")
+        self.assertIsInstance(missing, MissCache)
+
+        self.assertFalse(await missing.missed())
+
+        await missing.miss()
+        self.assertTrue(await missing.missed(), "Miss remembered")
+
+        await missing.expire()
+        self.assertFalse(await missing.missed(), "Expired once created")
+
+    async def test_if_none_match(self) -> None:
+        version = CommunityCache("TestLeague").scoreboard_version("match")
+        etag = await version.etag()
+
+        self.assertTrue(if_none_match(request(etag), etag))
+        self.assertTrue(if_none_match(request("W/" + etag), etag))
+        self.assertTrue(if_none_match(request('"other", ' + etag), etag))
+        self.assertFalse(if_none_match(request(), etag), "No header")
+
+        await version.bump()
+        self.assertFalse(
+            if_none_match(request(etag), await version.etag()),
+            "Changed once bumped"
+        )
+
+    async def test_listing_etag_changes_on_invalidate(self) -> None:
+        listings = ListingsCache("TestLeague")
+
+        async def matches(search: str = None, page: int = 1) -> list:
+            return []
+
+        etag = await listings.listing(matches, {}).etag()
+        await listings.invalidate()
+
+        self.assertNotEqual(
+            await listings.listing(matches, {}).etag(), etag,
+            "Cached listings revalidated"
+        )
+
+    def test_local_cache_evicts_least_recently_used(self) -> None:
+        cache = LocalCache(2, 1.0)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), (True, 1), "Recently used kept")
+        self.assertEqual(cache.get("b"), (False, None), "Oldest evicted")
+        self.assertEqual(cache.get("c"), (True, 3))
+
+    async def test_local_cache_ttl(self) -> None:
+        cache = LocalCache(16, 0.05)
+
+        cache.set("default", 1)
+        cache.set("shorter", 2, ttl=0.01)
+        cache.set("longer", 3, ttl=10)
+
+        await asyncio.sleep(0.02)
+        self.assertEqual(cache.get("shorter"), (False, None))
+        self.assertEqual(cache.get("default"), (True, 1))
+
+        await asyncio.sleep(0.04)
+        self.assertEqual(cache.get("default"), (False, None))
+        self.assertEqual(
+            cache.get("longer"), (False, None), "Capped to the local TTL"
+        )
+
+    async def test_publish_invalidation(self) -> None:
+        await publish_invalidation("a")
+
+        Sessions.redis = Redis()
+        await publish_invalidation("a", "b")
+
+        self.assertEqual(Sessions.redis.published, [
+            (INVALIDATION_CHANNEL, json.dumps([WORKER_ID, ["a", "b"]]))
+        ])
+
+    def test_handle_invalidation(self) -> None:
+        for key in ("a", "b", "c"):
+            Sessions.local_cache.set(key, key)
+
+        handle_invalidation(json.dumps([WORKER_ID, ["a"]]))
+        self.assertEqual(
+            Sessions.local_cache.get("a"), (True, "a"), "Own keys ignored"
+        )
+
+        handle_invalidation(json.dumps(["worker", ["a", "b"]]))
+        self.assertEqual(Sessions.local_cache.get("a"), (False, None))
+        self.assertEqual(Sessions.local_cache.get("b"), (False, None))
+        self.assertEqual(Sessions.local_cache.get("c"), (True, "c"))
+
+    async def test_cache_invalidator_reconnects(self) -> None:
+        Sessions.cache.endpoint, Sessions.cache.port = "127.0.0.1", 6379
+
+        subscribers = [Subscriber([]), Subscriber([])]
+        connects = [OSError("Connection refused")] + subscribers
+
+        async def create_redis(*args, **kwargs) -> Subscriber:
+            if not connects:
+                await asyncio.Future()
+
+            connect = connects.pop(0)
+            if isinstance(connect, Exception):
+                raise connect
+
+            # Copies another worker may invalidate while disconnected.
+            Sessions.local_cache.set("a", "a")
+
+            return connect
+
+        with asynctest.patch(
+                "SQLMatches.background_tasks.aioredis.create_redis",
+                create_redis):
+            task = asyncio.ensure_future(cache_invalidator(0.001))
+
+            while connects:
+                await asyncio.sleep(0.01)
+
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+        self.assertTrue(
+            all(subscriber.closed for subscriber in subscribers),
+            "Dropped connections closed"
+        )
+        self.assertEqual(
+            Sessions.local_cache.get("a"), (False, None),
+            "Local copies dropped once resubscribed"
+        )
+
+    async def test_finished_flag_kept(self) -> None:
+        community = CommunityCache("TestLeague")
+        finished = community.finished("match")
+
+        self.assertIsNone(finished.hard_ttl(), "Never expires")
+
+        await finished.flag()
+        await community.invalidate()
+
+        self.assertTrue(
+            await finished.flagged(), "Kept once the community is invalidated"
+        )
+
+    async def test_purge_releases_response(self) -> None:
+        Config.purge_url = "http://127.0.0.1/purge"
+        Config.webhook_timeout = 3
+
+        Sessions.aiohttp = HTTPSession()
+        try:
+            await purge("match-1", "community-TestLeague")
+            await asyncio.sleep(0.01)
+        finally:
+            Config.purge_url = None
+
+        (method, url, headers, resp), = Sessions.aiohttp.requests
+
+        self.assertEqual((method, url), ("PURGE", "http://127.0.0.1/purge"))
+        self.assertEqual(
+            headers, {"Surrogate-Key": "match-1 community-TestLeague"}
+        )
+        self.assertTrue(resp.released, "Connection given back to the pool")
+
+    async def test_lock_held_by_one(self) -> None:
+        cache = CommunityCache("TestLeague").stats()
+        held = []
+
+        async def hold(name: str) -> None:
+            async with cache.lock():
+                held.append(name)
+                await asyncio.sleep(0.02)
+                held.append(name)
+
+        await asyncio.gather(hold("a"), hold("b"))
+
+        self.assertEqual(held, ["a", "a", "b", "b"], "Never held at once")
+        self.assertFalse(
+            await Sessions.cache.exists(await cache.resolve() + "-lock"),
+            "Released"
+        )
+
+    async def test_shared_cache_not_held_locally(self) -> None:
+        cache = SharedCache("sent")
+
+        await cache.set(1)
+        # Like another worker setting it.
+        await Sessions.cache.set("sent", 2)
+
+        self.assertEqual(await cache.get(), 2, "Always read from redis")
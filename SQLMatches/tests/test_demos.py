@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import asyncio
+import asynctest
+import tempfile
+
+from os import listdir, path
+
+from benchmarks.uploads import (
+    CHUNK,
+    StandInBucket,
+    StandInDatabase,
+    StandInFile,
+    StandInParts,
+    StandInRequest
+)
+
+from ..community.match import Match
+from ..demos import Demo, PART_SIZE
+from ..exceptions import DemoTooLarge
+from ..resources import Config, Sessions
+from ..settings import B2UploadSettings, LocalUploadSettings
+
+
+class RecordingFile(StandInFile):
+    def __init__(self) -> None:
+        """Remembers parts sent & if it was cancelled."""
+
+        self.cancelled = False
+        self.uploaded = StandInParts()
+
+    def parts(self) -> StandInParts:
+        return self.uploaded
+
+    async def cancel(self) -> None:
+        self.cancelled = True
+
+
+class RecordingBucket(StandInBucket):
+    def __init__(self) -> None:
+        self.files = []
+
+    async def create_part(self, settings) -> tuple:
+        model, _ = await super().create_part(settings)
+
+        file = RecordingFile()
+        self.files.append(file)
+
+        return model, file
+
+
+class UnknownLengthRequest(StandInRequest):
+    def __init__(self, size: int) -> None:
+        super().__init__(size)
+
+        self.headers = {}
+        self.read = 0
+
+    async def stream(self):
+        async for chunk in super().stream():
+            self.read += len(chunk)
+            yield chunk
+
+
+class TestDemoUpload(asynctest.TestCase):
+    # Config & Sessions attributes changed by setUp.
+    CONFIG = ("upload_type", "demo_pathway", "demo_extension",
+              "free_upload_size", "max_upload_size", "upload_delay")
+    SESSIONS = ("bucket", "database")
+
+    async def setUp(self) -> None:
+        self.defaults = (
+            {name: getattr(Config, name, None) for name in self.CONFIG},
+            {name: getattr(Sessions, name, None) for name in self.SESSIONS}
+        )
+
+        self.directory = tempfile.TemporaryDirectory()
+
+        Config.demo_pathway = self.directory.name
+        Config.demo_extension = ".dem"
+        # StandInDatabase reports a subscription.
+        Config.free_upload_size = 1.0
+        Config.max_upload_size = 12.0
+        Config.upload_delay = 0
+
+        Sessions.bucket = RecordingBucket()
+        Sessions.database = StandInDatabase()
+
+    async def tearDown(self) -> None:
+        config, sessions = self.defaults
+        for name, value in config.items():
+            setattr(Config, name, value)
+        for name, value in sessions.items():
+            setattr(Sessions, name, value)
+
+        self.directory.cleanup()
+
+    def demo(self, request: StandInRequest) -> Demo:
+        return Demo(Match("0" * 36, "TestLeague"), request)
+
+    async def test_local_upload(self) -> None:
+        Config.upload_type = LocalUploadSettings
+
+        await self.demo(StandInRequest(500000)).upload()
+
+        self.assertEqual(
+            path.getsize(path.join(self.directory.name, "0" * 36 + ".dem")),
+            500000,
+            "Demo written"
+        )
+
+    async def test_local_content_length_too_large(self) -> None:
+        Config.upload_type = LocalUploadSettings
+
+        request = UnknownLengthRequest(13000000)
+        request.headers = {"content-length": "13000000"}
+
+        with self.assertRaises(DemoTooLarge):
+            await self.demo(request).upload()
+
+        self.assertEqual(request.read, 0, "Rejected before reading")
+        self.assertEqual(listdir(self.directory.name), [], "No file opened")
+
+    async def test_local_stream_too_large(self) -> None:
+        Config.upload_type = LocalUploadSettings
+
+        request = UnknownLengthRequest(13000000)
+
+        with self.assertRaises(DemoTooLarge):
+            await self.demo(request).upload()
+
+        self.assertLess(request.read, 13000000, "Stopped while streaming")
+        self.assertEqual(
+            listdir(self.directory.name), [], "Partial file removed"
+        )
+
+    async def test_local_open_error_kept(self) -> None:
+        Config.upload_type = LocalUploadSettings
+        Config.demo_pathway = path.join(self.directory.name, "missing")
+
+        with asynctest.patch("SQLMatches.demos.aiofiles_os.remove") as remove:
+            with self.assertRaises(FileNotFoundError):
+                await self.demo(StandInRequest(500000)).upload()
+
+        remove.assert_not_called()
+
+    async def test_b2_upload(self) -> None:
+        Config.upload_type = B2UploadSettings
+
+        await self.demo(StandInRequest(PART_SIZE * 2 + 1)).upload()
+
+        file, = Sessions.bucket.files
+        self.assertFalse(file.cancelled, "Upload finished")
+        self.assertEqual(file.uploaded.part_number, 3, "Sent in parts")
+
+    async def test_b2_content_length_too_large(self) -> None:
+        Config.upload_type = B2UploadSettings
+
+        with self.assertRaises(DemoTooLarge):
+            await self.demo(StandInRequest(13000000)).upload()
+
+        self.assertEqual(Sessions.bucket.files, [], "No large file started")
+
+    async def test_b2_stream_too_large(self) -> None:
+        Config.upload_type = B2UploadSettings
+
+        request = UnknownLengthRequest(PART_SIZE * 3)
+
+        with self.assertRaises(DemoTooLarge):
+            await self.demo(request).upload()
+
+        file, = Sessions.bucket.files
+        self.assertTrue(file.cancelled, "Parts sent cancelled")
+        self.assertEqual(file.uploaded.part_number, 2, "Stopped at limit")
+        self.assertLess(request.read, PART_SIZE * 3)
+
+    async def test_upload_delay_per_chunk(self) -> None:
+        Config.upload_delay = 0.000001
+        size = PART_SIZE + 1
+        sleep = asyncio.sleep
+
+        for upload_type in (LocalUploadSettings, B2UploadSettings):
+            Config.upload_type = upload_type
+            delays = []
+
+            async def recording_sleep(delay: float, *args, **kwargs):
+                if delay == Config.upload_delay:
+                    delays.append(delay)
+                await sleep(0)
+
+            with self.subTest(upload_type=upload_type.__name__), \
+                    asynctest.patch("SQLMatches.demos.asyncio.sleep",
+                                    recording_sleep):
+                await self.demo(StandInRequest(size)).upload()
+
+                self.assertEqual(
+                    len(delays), -(-size // len(CHUNK)),
+                    "Throttled once per chunk"
+                )
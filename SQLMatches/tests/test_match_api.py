@@ -24,6 +24,7 @@ DEALINGS IN THE SOFTWARE.
 import asynctest
 
 from .base import TestBase
+from ..resources import Config
 
 
 class TestMatchAPI(TestBase, asynctest.TestCase):
@@ -144,6 +145,18 @@ class TestMatchAPI(TestBase, asynctest.TestCase):
 
         self.assertEqual(resp.status_code, 200, "Get scoreboard ended")
 
+        resp = self.client.post(
+            "/api/profile/76561198077228213/matches/",
+            headers=self.basic_auth
+        )
+
+        self.assertEqual(resp.status_code, 200, "Profile matches listed")
+        self.assertIn(
+            match_id,
+            [match["match_id"] for match in (resp.json())["data"]],
+            "Match in profile history"
+        )
+
     def test_end_match(self) -> None:
         resp = self.client.post(
             "/api/match/create/",
@@ -170,6 +183,58 @@ class TestMatchAPI(TestBase, asynctest.TestCase):
 
         self.assertEqual(resp.status_code, 200, "Match ended")
 
+        resp = self.client.get(
+            "/api/match/{}/".format(match_id),
+            headers=self.basic_auth
+        )
+
+        self.assertEqual(
+            resp.headers["Cache-Control"],
+            "private, max-age={}".format(Config.browser_max_age),
+            "Finished matches reused by browsers"
+        )
+
+    def test_demo_upload_too_large(self) -> None:
+        resp = self.client.post(
+            "/api/match/create/",
+            json={
+                "team_1_name": "Ward",
+                "team_2_name": "Doggy",
+                "team_1_side": 0,
+                "team_2_side": 1,
+                "team_1_score": 8,
+                "team_2_score": 8,
+                "map_name": "de_mirage"
+            },
+            headers=self.basic_auth
+        )
+
+        self.assertEqual(resp.status_code, 200, "Match created")
+
+        match_id = (resp.json())["data"]["match_id"]
+
+        upload_sizes = Config.free_upload_size, Config.max_upload_size
+        Config.free_upload_size = Config.max_upload_size = 0.001
+        try:
+            resp = self.client.put(
+                "/api/match/{}/upload/".format(match_id),
+                data=b"\x00" * 2000,
+                headers=self.basic_auth
+            )
+        finally:
+            Config.free_upload_size, Config.max_upload_size = upload_sizes
+
+        self.assertEqual(resp.status_code, 413, "Demo over limit rejected")
+
+        resp = self.client.get(
+            "/api/match/{}/".format(match_id),
+            headers=self.basic_auth
+        )
+
+        self.assertEqual(
+            (resp.json())["data"]["demo_status"], 3, "Demo marked too large"
+        )
+
     def test_matches_list(self) -> None:
         resp = self.client.post(
             "/api/matches/",
@@ -177,3 +242,96 @@ class TestMatchAPI(TestBase, asynctest.TestCase):
         )
 
         self.assertEqual(resp.status_code, 200, "Match listed")
+
+    def rollup(self, map_name: str) -> dict:
+        resp = self.client.post(
+            "/api/community/owner/rollups/?community_name=TestLeague"
+            "&check_ownership=true",
+            json={"days": 1, "map_name": map_name},
+            headers=self.steam_session
+        )
+
+        self.assertEqual(resp.status_code, 200, "Rollups listed")
+
+        for rollup in (resp.json())["data"]["maps"]:
+            if rollup["map"] == map_name:
+                return {
+                    "matches": rollup["matches"],
+                    "rounds": rollup["rounds"]
+                }
+
+        return {"matches": 0, "rounds": 0}
+
+    def test_rollups(self) -> None:
+        before = self.rollup("de_vertigo")
+
+        resp = self.client.post(
+            "/api/match/create/",
+            json={
+                "team_1_name": "Ward",
+                "team_2_name": "Doggy",
+                "team_1_side": 0,
+                "team_2_side": 1,
+                "team_1_score": 16,
+                "team_2_score": 9,
+                "map_name": "de_vertigo"
+            },
+            headers=self.basic_auth
+        )
+
+        self.assertEqual(resp.status_code, 200, "Match created")
+
+        match_id = (resp.json())["data"]["match_id"]
+
+        self.assertEqual(
+            self.rollup("de_vertigo"), before, "Live matches not rolled up"
+        )
+
+        resp = self.client.delete(
+            "/api/match/{}/".format(match_id),
+            headers=self.basic_auth
+        )
+
+        self.assertEqual(resp.status_code, 200, "Match ended")
+
+        ended = self.rollup("de_vertigo")
+        self.assertEqual(ended, {
+            "matches": before["matches"] + 1,
+            "rounds": before["rounds"] + 25
+        }, "Ended match rolled up")
+
+        resp = self.client.post(
+            "/api/admin/rollups/?check_root=true",
+            json={"community_name": "TestLeague"},
+            headers=self.steam_session
+        )
+
+        self.assertEqual(resp.status_code, 200, "Rollups rebuilt")
+        self.assertEqual(
+            self.rollup("de_vertigo"), ended, "Rebuilt from finished matches"
+        )
+
+        resp = self.client.request(
+            "DELETE",
+            "/api/community/owner/matches/?community_name=TestLeague"
+            "&check_ownership=true",
+            json={"matches": [match_id]},
+            headers=self.steam_session
+        )
+
+        self.assertEqual(resp.status_code, 200, "Match deleted")
+        self.assertEqual(
+            self.rollup("de_vertigo"), before, "Deleted match subtracted"
+        )
+
+    def test_websocket_metrics(self) -> None:
+        resp = self.client.get(
+            "/api/admin/websocket/?check_root=true",
+            headers=self.steam_session
+        )
+
+        self.assertEqual(resp.status_code, 200, "Metrics listed")
+
+        data = (resp.json())["data"]
+        self.assertIn("events", data["total"], "Totalled across workers")
+        self.assertTrue(data["workers"], "Labelled per worker")
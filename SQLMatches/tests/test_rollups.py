@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import asynctest
+
+from datetime import date, datetime, timedelta
+from os import path
+from tempfile import TemporaryDirectory
+
+from databases import Database
+
+from ..resources import Sessions, Config
+from ..tables import create_tables, scoreboard_total_table
+from ..rollups import rollup_matches, backfill_rollups
+from ..community import Community
+
+
+class TestRollups(asynctest.TestCase):
+    use_default_loop = True
+
+    async def setUp(self) -> None:
+        # sqlite has no additive upsert,
+        # so rollups are read-modify-written.
+        self.directory = TemporaryDirectory()
+        database_url = "sqlite:///" + path.join(
+            self.directory.name, "sqlmatches.db"
+        )
+
+        create_tables(database_url)
+
+        Config.db_engine = "sqlite"
+        Sessions.database = Database(database_url)
+        await Sessions.database.connect()
+
+        self.community = Community("TestLeague")
+
+        await Sessions.database.execute_many(
+            query=scoreboard_total_table.insert(),
+            values=[
+                self.match("1", "de_mirage", 16, 8),
+                self.match("2", "de_mirage", 16, 14),
+                self.match("3", "de_dust2", 10, 16),
+                self.match("4", "de_mirage", 5, 3, status=1),
+                self.match("5", "de_mirage", 16, 0, days=2)
+            ]
+        )
+
+    async def tearDown(self) -> None:
+        await Sessions.database.disconnect()
+        self.directory.cleanup()
+
+    def match(self, match_id: str, map_name: str, team_1_score: int,
+              team_2_score: int, status: int = 0, days: int = 0) -> dict:
+        return {
+            "match_id": match_id,
+            "community_name": self.community.community_name,
+            "timestamp": datetime.now() - timedelta(days=days),
+            "status": status,
+            "demo_status": 0,
+            "map": map_name,
+            "team_1_name": "Ward",
+            "team_2_name": "Doggy",
+            "team_1_score": team_1_score,
+            "team_2_score": team_2_score
+        }
+
+    async def maps(self, since: date = None) -> dict:
+        return {
+            rollup.map: (rollup.matches, rollup.rounds)
+            async for rollup in self.community.map_rollups(
+                since or date.today() - timedelta(days=7)
+            )
+        }
+
+    async def test_rollups_added(self) -> None:
+        await rollup_matches([("1", self.community.community_name)])
+        await rollup_matches([
+            ("2", self.community.community_name),
+            ("3", self.community.community_name)
+        ])
+
+        self.assertEqual(
+            await self.maps(),
+            {"de_mirage": (2, 54), "de_dust2": (1, 26)},
+            "Added to the existing bucket"
+        )
+
+    async def test_live_matches_ignored(self) -> None:
+        await rollup_matches([
+            ("4", self.community.community_name),
+            ("1", "OtherLeague")
+        ])
+
+        self.assertEqual(await self.maps(), {})
+
+    async def test_rollups_removed(self) -> None:
+        await rollup_matches([
+            ("1", self.community.community_name),
+            ("2", self.community.community_name)
+        ])
+        await rollup_matches(
+            [("1", self.community.community_name)], remove=True
+        )
+
+        self.assertEqual(
+            await self.maps(), {"de_mirage": (1, 30)},
+            "Subtracted from the bucket"
+        )
+
+    async def test_daily_rollups(self) -> None:
+        await rollup_matches([
+            (match_id, self.community.community_name)
+            for match_id in ("1", "2", "3", "5")
+        ])
+
+        days = [
+            (rollup.day, rollup.matches, rollup.rounds)
+            async for rollup in self.community.daily_rollups(
+                date.today() - timedelta(days=7), "de_mirage"
+            )
+        ]
+
+        self.assertEqual(days, [
+            (date.today() - timedelta(days=2), 1, 16),
+            (date.today(), 2, 54)
+        ])
+
+    async def test_backfill_rollups(self) -> None:
+        await rollup_matches([("1", self.community.community_name)])
+        await rollup_matches([("1", self.community.community_name)])
+
+        await backfill_rollups(chunk_size=2)
+
+        self.assertEqual(
+            await self.maps(),
+            {"de_mirage": (3, 70), "de_dust2": (1, 26)},
+            "Rebuilt from every finished match"
+        )
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import asyncio
+import asynctest
+
+from time import time
+
+from aiocache import Cache
+from aiojobs import create_scheduler
+from socketio import packet
+from socketio.asyncio_pubsub_manager import AsyncPubSubManager
+
+from ..resources import Sessions, Config
+from ..caches import LocalCache, CommunityCache, WORKER_ID
+from ..responses import dumps
+from ..websocket_server import (
+    WebsocketServer,
+    WebsocketMetrics,
+    MeteredFanOut
+)
+from ..broadcast import (
+    use_manager,
+    match_update,
+    match_room,
+    report_metrics,
+    cluster_metrics,
+    METRICS_KEY
+)
+
+
+def scoreboard(team_1_score: int, kills: int) -> dict:
+    return {
+        "match_id": "match",
+        "status": 1,
+        "team_1_score": team_1_score,
+        "team_1": [{"steam_id": "76561198077228213", "kills": kills}],
+        "team_2": []
+    }
+
+
+class MemoryBroker:
+    def __init__(self) -> None:
+        """Stands in for redis pub/sub between servers
+        in one process.
+        """
+
+        self.queues = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self.queues.append(queue)
+        return queue
+
+    async def publish(self, message: dict) -> None:
+        for queue in self.queues:
+            queue.put_nowait(message)
+
+
+class MemoryManager(MeteredFanOut, AsyncPubSubManager):
+    name = "memory"
+
+    def __init__(self, broker: MemoryBroker, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.broker = broker
+        self.queue = broker.subscribe()
+
+    async def _publish(self, data: dict) -> None:
+        await self.broker.publish(data)
+
+    async def _listen(self) -> dict:
+        return await self.queue.get()
+
+
+class Redis:
+    def __init__(self) -> None:
+        """Stands in for the hashes of Sessions.redis."""
+
+        self.hashes = {}
+
+    async def hset(self, key: str, field: str, value: bytes) -> None:
+        self.hashes.setdefault(key, {})[field] = value
+
+    async def hgetall(self, key: str, encoding: str = None) -> dict:
+        return {
+            field: value.decode(encoding) if encoding else value
+            for field, value in self.hashes.get(key, {}).items()
+        }
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.hashes[key].pop(field, None)
+
+
+class Socket:
+    def __init__(self) -> None:
+        """Stands in for a engineio socket."""
+
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class Worker:
+    def __init__(self, server: WebsocketServer) -> None:
+        """A app instance with one socket connected.
+
+        Parameters
+        ----------
+        server : WebsocketServer
+        """
+
+        self.server = server
+        self.sid = "{}-sid".format(id(server))
+        self.socket = Socket()
+        self.received = []
+
+        async def send_packet(sid, pkt):
+            if pkt.packet_type == packet.EVENT:
+                self.received.append((sid, *pkt.data))
+
+        self.server._send_packet = send_packet
+
+        self.server.manager.initialize()
+        self.server.manager_initialized = True
+        self.server.manager.connect(self.sid, "/")
+        self.server.eio.sockets[self.sid] = self.socket
+
+    def subscribe(self, room: str) -> None:
+        self.server.enter_room(self.sid, room)
+
+    def close(self) -> None:
+        self.server.manager.thread.cancel()
+        self.server.manager.disconnect(self.sid, "/")
+        self.server.eio.sockets.pop(self.sid, None)
+
+
+class TestWebsocketManager(asynctest.TestCase):
+    use_default_loop = True
+
+    async def setUp(self) -> None:
+        self.broker = MemoryBroker()
+
+        # Stands in for redis shared between workers.
+        Sessions.cache = Cache(Cache.MEMORY)
+        Sessions.local_cache = LocalCache(1024, 1.0)
+        Sessions.redis = None
+
+        Config.emit_window = 0
+        Config.cache_hard_ttl = 300
+        Config.timestamp_format = "%m/%d/%Y-%H:%M:%S"
+        Sessions.scheduler = await create_scheduler()
+
+        self.default_manager = Sessions.websocket.manager
+        Sessions.websocket.metrics = WebsocketMetrics()
+        use_manager(MemoryManager(self.broker))
+
+        self.local = Worker(Sessions.websocket)
+        self.remote = Worker(WebsocketServer(
+            async_mode="asgi", client_manager=MemoryManager(self.broker)
+        ))
+
+    async def tearDown(self) -> None:
+        self.local.close()
+        self.remote.close()
+
+        use_manager(self.default_manager)
+
+        await Sessions.cache.clear()
+
+        await Sessions.scheduler.close()
+
+    async def test_emit_reaches_other_workers(self) -> None:
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(
+            self.remote.received,
+            [(self.remote.sid, "scoreboard_snapshot", {
+                "match_id": "match",
+                "version": 1,
+                "scoreboard": scoreboard(1, 0)
+            })],
+            "Scoreboard sent to a socket on another worker"
+        )
+        self.assertEqual(
+            self.local.received, [], "Not sent to unsubscribed sockets"
+        )
+
+    async def test_emit_reaches_own_worker(self) -> None:
+        self.local.subscribe(match_room("match"))
+        self.remote.subscribe(match_room("other"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(len(self.local.received), 1, "Sent once locally")
+        self.assertEqual(self.remote.received, [], "Only sent to room")
+
+    async def test_patch_after_snapshot(self) -> None:
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await match_update("TestLeague", "match", scoreboard(2, 1), 2)
+        # Version 3 sent by no one, so 4 is patched onto 2.
+        await match_update("TestLeague", "match", scoreboard(3, 1), 4)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(
+            [event for _, event, _ in self.remote.received],
+            ["scoreboard_snapshot", "scoreboard_patch",
+             "scoreboard_patch"]
+        )
+        self.assertEqual(
+            (self.remote.received[2][2]["base"],
+             self.remote.received[2][2]["version"]),
+            (2, 4),
+            "Patched onto the last version sent"
+        )
+        self.assertEqual(
+            self.remote.received[1][2],
+            {
+                "match_id": "match",
+                "base": 1,
+                "version": 2,
+                "match": {"team_1_score": 2},
+                "players": {"76561198077228213": {"kills": 1}},
+                "removed": []
+            },
+            "Only changed fields patched"
+        )
+
+    async def test_patch_after_other_workers_update(self) -> None:
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        # Next version handled by a worker with nothing held locally.
+        Sessions.local_cache.clear()
+        await match_update("TestLeague", "match", scoreboard(2, 0), 2)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(
+            self.remote.received[1][1:],
+            ("scoreboard_patch", {
+                "match_id": "match",
+                "base": 1,
+                "version": 2,
+                "match": {"team_1_score": 2},
+                "players": {},
+                "removed": []
+            }),
+            "Patched against the version the other worker sent"
+        )
+
+    async def test_updates_coalesced(self) -> None:
+        Config.emit_window = 0.05
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await match_update("TestLeague", "match", scoreboard(2, 1), 2)
+        await match_update("TestLeague", "match", scoreboard(3, 2), 3)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(
+            self.remote.received,
+            [(self.remote.sid, "scoreboard_snapshot", {
+                "match_id": "match",
+                "version": 3,
+                "scoreboard": scoreboard(3, 2)
+            })],
+            "Only the latest update sent"
+        )
+
+    async def test_older_versions_dropped(self) -> None:
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(2, 1), 2)
+        # Request for version 1 finished after version 2's.
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await asyncio.sleep(0.05)
+
+        Config.emit_window = 0.05
+        await match_update("TestLeague", "match", scoreboard(4, 1), 4)
+        await match_update("TestLeague", "match", scoreboard(3, 1), 3)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(
+            [(event, data["version"])
+             for _, event, data in self.remote.received],
+            [("scoreboard_snapshot", 2), ("scoreboard_patch", 4)],
+            "Scoreboards never go backwards"
+        )
+
+    async def test_workers_interleaved(self) -> None:
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(4, 0), 4)
+        await asyncio.sleep(0.05)
+
+        # Version 5's worker reads the last sent scoreboard first,
+        # but version 6's worker would finish reading it first.
+        get = Sessions.cache.get
+        delays = [0.1, 0.01]
+
+        async def slow_get(key: str, *args, **kwargs):
+            value = await get(key, *args, **kwargs)
+            if key.endswith("-sent") and delays:
+                await asyncio.sleep(delays.pop(0))
+            return value
+
+        Sessions.cache.get = slow_get
+
+        await asyncio.gather(
+            match_update("TestLeague", "match", scoreboard(5, 1), 5),
+            match_update("TestLeague", "match", scoreboard(6, 2), 6)
+        )
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(
+            [(data.get("base"), data["version"])
+             for _, _, data in self.remote.received],
+            [(None, 4), (4, 5), (5, 6)],
+            "Each patch onto the version sent before it"
+        )
+        self.assertEqual(
+            (await CommunityCache("TestLeague").sent_scoreboard(
+                "match"
+            ).get())["version"],
+            6,
+            "Last sent never goes backwards"
+        )
+
+    async def test_fan_out_counted_where_delivered(self) -> None:
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await asyncio.sleep(0.05)
+
+        local = self.local.server.metrics.event("scoreboard_snapshot")
+        remote = self.remote.server.metrics.event("scoreboard_snapshot")
+
+        self.assertEqual(
+            (local.emits, local.fan_outs, local.deliveries), (1, 1, 0),
+            "Emitted & published here, with no sockets in the room"
+        )
+        self.assertEqual(
+            (remote.emits, remote.fan_outs, remote.deliveries), (0, 1, 1),
+            "Sent to sockets where received"
+        )
+        self.assertEqual(remote.api_schema["average_fan_out"], 1.0)
+        self.assertGreater(remote.max_fan_out_seconds, 0)
+
+    async def test_cluster_metrics(self) -> None:
+        Sessions.redis = Redis()
+        Sessions.websocket.metrics.connect()
+        await report_metrics()
+
+        remote = WebsocketMetrics()
+        remote.connect()
+        remote.connect()
+        remote.event("scoreboard_patch").deliveries = 4
+        remote.event("scoreboard_patch").fan_out(0.002)
+
+        await Sessions.redis.hset(METRICS_KEY, "remote", dumps({
+            "reported": time(), "counts": remote.counts
+        }))
+        await Sessions.redis.hset(METRICS_KEY, "stopped", dumps({
+            "reported": 0, "counts": remote.counts
+        }))
+
+        metrics = await cluster_metrics()
+
+        self.assertEqual(
+            set(metrics["workers"]), {WORKER_ID, "remote"},
+            "Labelled per worker, stopped workers left out"
+        )
+        self.assertNotIn("stopped", Sessions.redis.hashes[METRICS_KEY])
+        self.assertEqual(metrics["total"]["connected"], 3)
+        self.assertEqual(
+            metrics["total"]["events"]["scoreboard_patch"]["deliveries"], 4
+        )
+        self.assertEqual(
+            metrics["workers"]["remote"]["events"]["scoreboard_patch"][
+                "max_fan_out_ms"
+            ],
+            2.0
+        )
+
+    async def test_slow_socket_skipped(self) -> None:
+        self.remote.subscribe(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await asyncio.sleep(0.05)
+
+        for _ in range(self.remote.server.max_queued):
+            self.remote.socket.queue.put_nowait(None)
+
+        await match_update("TestLeague", "match", scoreboard(2, 0), 2)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(
+            [event for _, event, _ in self.remote.received],
+            ["scoreboard_snapshot"],
+            "Patch skipped for backlogged socket"
+        )
+        self.assertFalse(self.remote.socket.closed, "Patches don't close")
+
+    async def test_slow_socket_disconnected(self) -> None:
+        self.remote.subscribe(match_room("match"))
+        for _ in range(self.remote.server.max_queued):
+            self.remote.socket.queue.put_nowait(None)
+
+        # A snapshot can't be noticed missing.
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await asyncio.sleep(0.05)
+
+        self.assertTrue(self.remote.socket.closed, "Backlogged socket closed")
+        self.assertFalse(
+            self.remote.server.manager.is_connected(self.remote.sid, "/"),
+            "Left its rooms, so resubscribes on reconnect"
+        )
+
+    async def test_event_listener_on_other_worker(self) -> None:
+        listener = self.remote.server.listen(match_room("match"))
+
+        await match_update("TestLeague", "match", scoreboard(1, 0), 1)
+        await asyncio.sleep(0.05)
+
+        event = listener.queue.get_nowait()
+        self.assertEqual(event.event, "scoreboard_snapshot")
+        self.assertEqual(event.data["scoreboard"], scoreboard(1, 0))
+
+        self.remote.server.stop_listening(listener)
@@ -30,6 +30,7 @@ from .tables import (
     api_key_table
 )
 from .resources import Sessions, Config
+from .responses import dumps
 
 
 class WebhookPusher:
@@ -52,7 +53,8 @@ class WebhookPusher:
             await Sessions.aiohttp.post(
                 url,
                 timeout=Config.webhook_timeout,
-                json=self.data,
+                data=dumps(self.data),
+                headers={"Content-Type": "application/json"},
                 auth=BasicAuth("", key)
             )
         except ClientConnectionError:
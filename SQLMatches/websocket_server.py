@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import asyncio
+import socketio
+
+from socketio import packet
+from socketio.asyncio_pubsub_manager import AsyncPubSubManager
+from time import perf_counter
+from typing import Any, Dict
+from uuid import uuid4
+
+
+# Events tracked by name, past this they're counted under OTHER_EVENTS.
+MAX_TRACKED_EVENTS = 256
+OTHER_EVENTS = "other"
+
+
+class EventMetrics:
+    __slots__ = ("emits", "fan_outs", "deliveries", "skipped", "packets",
+                 "bytes", "fan_out_seconds", "max_fan_out_seconds")
+
+    # Added together when merged, max_fan_out_seconds is maxed.
+    SUMMED = ("emits", "fan_outs", "deliveries", "skipped", "packets",
+              "bytes", "fan_out_seconds")
+
+    def __init__(self) -> None:
+        """Counts for one event name.
+        """
+
+        # Emits made by this worker, published to every worker
+        # by pub/sub managers.
+        self.emits = 0
+        # Emits sent to this worker's sockets & event listeners.
+        self.fan_outs = 0
+        self.deliveries = 0
+        self.skipped = 0
+        # Sent to sockets, event listeners encode separately.
+        self.packets = 0
+        self.bytes = 0
+        self.fan_out_seconds = 0.0
+        self.max_fan_out_seconds = 0.0
+
+    def fan_out(self, elapsed: float) -> None:
+        self.fan_outs += 1
+        self.fan_out_seconds += elapsed
+        if elapsed > self.max_fan_out_seconds:
+            self.max_fan_out_seconds = elapsed
+
+    @property
+    def counts(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def merge(self, counts: dict) -> None:
+        for name in self.SUMMED:
+            setattr(self, name, getattr(self, name) + counts[name])
+
+        if counts["max_fan_out_seconds"] > self.max_fan_out_seconds:
+            self.max_fan_out_seconds = counts["max_fan_out_seconds"]
+
+    @property
+    def api_schema(self) -> dict:
+        return {
+            "emits": self.emits,
+            "fan_outs": self.fan_outs,
+            "deliveries": self.deliveries,
+            "skipped": self.skipped,
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "average_fan_out": (
+                round(self.deliveries / self.fan_outs, 2)
+                if self.fan_outs > 0 else 0.00
+            ),
+            "average_bytes": (
+                round(self.bytes / self.packets, 2)
+                if self.packets > 0 else 0.00
+            ),
+            "average_fan_out_ms": (
+                round(self.fan_out_seconds / self.fan_outs * 1000, 3)
+                if self.fan_outs > 0 else 0.00
+            ),
+            "max_fan_out_ms": round(self.max_fan_out_seconds * 1000, 3)
+        }
+
+
+class WebsocketMetrics:
+    def __init__(self) -> None:
+        """Counts of a worker's websocket server since started,
+        or of many workers merged.
+        """
+
+        self.connected = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.event_listeners = 0
+        self.events: Dict[str, EventMetrics] = {}
+
+    def event(self, event: str) -> EventMetrics:
+        metrics = self.events.get(event)
+        if metrics is None:
+            if len(self.events) >= MAX_TRACKED_EVENTS:
+                event = OTHER_EVENTS
+                metrics = self.events.get(event)
+
+            if metrics is None:
+                metrics = self.events[event] = EventMetrics()
+
+        return metrics
+
+    def connect(self) -> None:
+        self.connected += 1
+        self.connects += 1
+
+    def disconnect(self) -> None:
+        self.connected -= 1
+        self.disconnects += 1
+
+    @property
+    def counts(self) -> dict:
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "event_listeners": self.event_listeners,
+            "events": {
+                event: metrics.counts
+                for event, metrics in self.events.items()
+            }
+        }
+
+    def merge(self, counts: dict) -> None:
+        """Adds counts of another worker.
+
+        Parameters
+        ----------
+        counts : dict
+            From counts.
+        """
+
+        self.connected += counts["connected"]
+        self.connects += counts["connects"]
+        self.disconnects += counts["disconnects"]
+        self.event_listeners += counts["event_listeners"]
+
+        for event, event_counts in counts["events"].items():
+            self.event(event).merge(event_counts)
+
+    @property
+    def api_schema(self) -> dict:
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "event_listeners": self.event_listeners,
+            "events": {
+                event: metrics.api_schema
+                for event, metrics in self.events.items()
+            }
+        }
+
+
+class MeteredFanOut:
+    """Mixed into a client manager before its class, times & counts
+    emits sent to this worker's sockets in the server's metrics.
+    Pub/sub managers only publish when emitting, each worker sends
+    the emit to its sockets once it's received in _handle_emit.
+    """
+
+    async def emit(self, event, data, namespace=None, **kwargs) -> None:
+        if isinstance(self, AsyncPubSubManager) and \
+                not kwargs.get("ignore_queue"):
+            return await super().emit(event, data, namespace, **kwargs)
+
+        started = perf_counter()
+        try:
+            return await super().emit(event, data, namespace, **kwargs)
+        finally:
+            self.server.metrics.event(event).fan_out(
+                perf_counter() - started
+            )
+
+    async def _handle_emit(self, message: dict) -> None:
+        started = perf_counter()
+        try:
+            await super()._handle_emit(message)
+        finally:
+            self.server.metrics.event(message["event"]).fan_out(
+                perf_counter() - started
+            )
+
+
+class MeteredManager(MeteredFanOut, socketio.AsyncManager):
+    """Client manager of a single worker."""
+
+
+class MeteredRedisManager(MeteredFanOut, socketio.AsyncRedisManager):
+    """Client manager sharing emits between workers through redis."""
+
+
+class ServerSentEvent:
+    __slots__ = ("event", "data", "encoded")
+
+    def __init__(self, event: str, data: Any) -> None:
+        """A emit, shared by every listener it's sent to
+        so it's only encoded once.
+
+        Parameters
+        ----------
+        event : str
+        data : Any
+        """
+
+        self.event = event
+        self.data = data
+        self.encoded = None
+
+
+class EventListener:
+    __slots__ = ("sid", "queue")
+
+    def __init__(self, max_queued: int) -> None:
+        """Receives emits to a room without a socket.
+
+        Parameters
+        ----------
+        max_queued : int
+            Events held before the listener is closed,
+            0 for no limit.
+        """
+
+        self.sid = "sse-" + uuid4().hex
+        # None is queued when the listener is closed.
+        self.queue = asyncio.Queue(max_queued + 1 if max_queued else 0)
+
+
+class WebsocketServer(socketio.AsyncServer):
+    """Stops sockets with too many packets waiting to be sent from
+    growing memory. Scoreboard patches carry versions, so they're
+    skipped & the client resyncs. Other events can't be missed
+    unnoticed, so the socket is disconnected & resubscribes.
+
+    Event listeners join rooms like sockets do, so they're sent
+    emits from every worker through the client manager.
+
+    Counts emits, deliveries, bytes & skips per event in metrics,
+    fan-out is timed by client managers using MeteredFanOut.
+    """
+
+    # Packets a socket can have waiting, 0 for no limit.
+    max_queued = 64
+    # Events clients notice missing, skipped for backlogged sockets.
+    skippable_events = ("scoreboard_patch",)
+
+    def __init__(self, *args, **kwargs) -> None:
+        if kwargs.get("client_manager") is None:
+            kwargs["client_manager"] = MeteredManager()
+
+        super().__init__(*args, **kwargs)
+
+        self.listeners: Dict[str, EventListener] = {}
+        self.metrics = WebsocketMetrics()
+        self.__last_event = None
+
+    @property
+    def metrics_schema(self) -> dict:
+        return self.metrics.api_schema
+
+    def listen(self, room: str) -> EventListener:
+        """Listens to emits to a room.
+
+        Parameters
+        ----------
+        room : str
+
+        Returns
+        -------
+        EventListener
+        """
+
+        # Starts the client manager listening to other workers,
+        # normally done when the first socket connects.
+        if not self.manager_initialized:
+            self.manager_initialized = True
+            self.manager.initialize()
+
+        listener = EventListener(self.max_queued)
+        self.listeners[listener.sid] = listener
+        self.metrics.event_listeners += 1
+
+        self.manager.connect(listener.sid, "/")
+        self.enter_room(listener.sid, room)
+
+        return listener
+
+    def stop_listening(self, listener: EventListener) -> None:
+        if self.listeners.pop(listener.sid, None) is not None:
+            self.metrics.event_listeners -= 1
+            self.manager.disconnect(listener.sid, "/")
+
+    def __queue_event(self, listener: EventListener, event: str,
+                      data: Any) -> None:
+        # A emit calls _emit_internal once per participant
+        # with the same data.
+        last_event = self.__last_event
+        if last_event is None or last_event.data is not data \
+                or last_event.event != event:
+            last_event = self.__last_event = ServerSentEvent(event, data)
+
+        if listener.queue.maxsize and \
+                listener.queue.qsize() >= listener.queue.maxsize - 1:
+            self.metrics.event(event).skipped += 1
+
+            # Closed, so the client reconnects & gets a snapshot.
+            while not listener.queue.empty():
+                listener.queue.get_nowait()
+            listener.queue.put_nowait(None)
+            self.stop_listening(listener)
+        else:
+            listener.queue.put_nowait(last_event)
+
+    async def emit(self, event, data=None, *args, **kwargs) -> None:
+        self.metrics.event(event).emits += 1
+        await super().emit(event, data, *args, **kwargs)
+
+    async def _emit_internal(self, sid, event, data, namespace=None,
+                             id=None) -> None:
+        metrics = self.metrics.event(event)
+
+        listener = self.listeners.get(sid)
+        if listener is not None:
+            metrics.deliveries += 1
+            self.__queue_event(listener, event, data)
+            return
+
+        if self.max_queued:
+            socket = self.eio.sockets.get(sid)
+            if socket is not None and \
+                    socket.queue.qsize() >= self.max_queued:
+                metrics.skipped += 1
+
+                if event not in self.skippable_events:
+                    await self.disconnect(sid, namespace, ignore_queue=True)
+
+                return
+
+        metrics.deliveries += 1
+        await super()._emit_internal(sid, event, data, namespace, id)
+
+    async def _send_packet(self, sid, pkt) -> None:
+        encoded_packet = pkt.encode()
+
+        if pkt.packet_type == packet.EVENT:
+            metrics = self.metrics.event(pkt.data[0])
+            metrics.packets += 1
+            metrics.bytes += sum(
+                map(len, encoded_packet)
+            ) if isinstance(encoded_packet, list) else len(encoded_packet)
+
+        if isinstance(encoded_packet, list):
+            binary = False
+            for encoded in encoded_packet:
+                await self.eio.send(sid, encoded, binary=binary)
+                binary = True
+        else:
+            await self.eio.send(sid, encoded_packet, binary=False)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+# Compares encoding a 30 player scoreboard & a 100 match listing
+# with the stdlib json encoder & strftime per row against the orjson
+# encoder responses now use.
+#
+# python -m benchmarks.responses
+
+import json
+
+from datetime import datetime, timedelta
+from timeit import timeit
+
+from SQLMatches.resources import Config
+from SQLMatches.community.models import MatchModel, ScoreboardModel
+from SQLMatches.responses import encode, EPOCH_TIMESTAMPS, ISO_TIMESTAMPS
+
+
+Config.url = "https://sqlmatches.com/"
+Config.map_images = {"de_dust2": "dust2.jpg"}
+Config.cover_images = {"de_dust2": Config.url + "maps/dust2.jpg"}
+Config.invalid_cover_image = Config.url + "maps/invalid.png"
+
+NUMBER = 2000
+
+MATCH = {
+    "match_id": "0" * 36,
+    "timestamp": datetime(2021, 1, 1),
+    "status": 1,
+    "demo_status": 0,
+    "map": "de_dust2",
+    "team_1_name": "Counter-Terrorists",
+    "team_2_name": "Terrorists",
+    "team_1_score": 8,
+    "team_2_score": 7,
+    "team_1_side": 0,
+    "team_2_side": 1,
+    "community_name": "Benchmark"
+}
+
+
+def player(index: int) -> dict:
+    return {
+        "name": "Player {}".format(index),
+        "steam_id": str(76561198000000000 + index),
+        "team": index % 2,
+        "alive": True,
+        "ping": 32,
+        "kills": 20,
+        "headshots": 10,
+        "assists": 5,
+        "deaths": 12,
+        "shots_fired": 400,
+        "shots_hit": 120,
+        "mvps": 3,
+        "score": 45,
+        "disconnected": False,
+        "kdr": 1.67,
+        "hs_percentage": 50.0,
+        "hit_percentage": 30.0
+    }
+
+
+def strftime(schema: dict) -> dict:
+    """What api_schema used to do."""
+
+    return {
+        **schema,
+        "timestamp": schema["timestamp"].strftime(Config.timestamp_format)
+    }
+
+
+def stdlib_encode(data) -> bytes:
+    """How responses used to encode."""
+
+    return json.dumps(
+        {"data": data, "error": False},
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def main() -> None:
+    scoreboard = ScoreboardModel(
+        [player(index) for index in range(0, 30, 2)],
+        [player(index) for index in range(1, 30, 2)],
+        MATCH
+    )
+
+    matches = [
+        MatchModel(**{
+            **MATCH,
+            "timestamp": MATCH["timestamp"] + timedelta(minutes=index)
+        })
+        for index in range(100)
+    ]
+
+    cases = (
+        (
+            "30 player scoreboard",
+            lambda: strftime(scoreboard.api_schema),
+            lambda: scoreboard.api_schema
+        ),
+        (
+            "100 match listing",
+            lambda: [strftime(match.api_schema) for match in matches],
+            lambda: [match.api_schema for match in matches]
+        )
+    )
+
+    formats = (
+        "%m/%d/%Y-%H:%M:%S",
+        ISO_TIMESTAMPS,
+        EPOCH_TIMESTAMPS
+    )
+
+    for name, old_data, data in cases:
+        Config.timestamp_format = formats[0]
+        baseline = timeit(lambda: stdlib_encode(old_data()), number=NUMBER)
+
+        print("{}, stdlib json: {:.1f} us".format(
+            name, baseline / NUMBER * 1e6
+        ))
+
+        for timestamp_format in formats:
+            Config.timestamp_format = timestamp_format
+            took = timeit(lambda: encode(data()), number=NUMBER)
+
+            print("{}, orjson {}: {:.1f} us ({:.1f}x)".format(
+                name, timestamp_format, took / NUMBER * 1e6,
+                baseline / took
+            ))
+
+
+if __name__ == "__main__":
+    main()
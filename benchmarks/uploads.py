@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+GNU General Public License v3.0 (GPL v3)
+Copyright (c) 2020-2021 WardPearce
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+# Streams 100 MB & 1 GB demos through the b2 upload against a local
+# stand-in bucket, comparing the part assembly uploads used to do by
+# concatenating bytes with the preallocated PartBuffer. Assembly is
+# measured with upload_delay at 0, both sleep upload_delay per chunk
+# & the throughput with it is reported on its own.
+#
+# python -m benchmarks.uploads
+
+import asyncio
+import tracemalloc
+
+from hashlib import sha1
+from time import perf_counter
+from types import SimpleNamespace
+
+from SQLMatches.community.match import Match
+from SQLMatches.demos import Demo, PART_SIZE
+from SQLMatches.resources import Config, Sessions
+from SQLMatches.settings import B2UploadSettings
+
+
+# Default of SQLMatches' upload_delay.
+UPLOAD_DELAY = 0.00001
+
+# Roughly what uvicorn hands starlette per receive.
+CHUNK = b"\x00" * 65536
+
+SIZES = (100000000, 1000000000)
+
+
+class StandInParts:
+    """Hashes parts like the b2 client does, without posting them."""
+
+    def __init__(self) -> None:
+        self.part_number = 0
+        self.sha1s = []
+
+    async def data(self, data: bytes) -> None:
+        self.part_number += 1
+        self.sha1s.append(sha1(data).hexdigest())
+
+    async def finish(self) -> None:
+        pass
+
+
+class StandInFile:
+    def parts(self) -> StandInParts:
+        return StandInParts()
+
+    async def cancel(self) -> None:
+        pass
+
+
+class StandInBucket:
+    async def create_part(self, settings) -> tuple:
+        return SimpleNamespace(file_id="benchmark"), StandInFile()
+
+    async def upload(self, settings, data: bytes) -> tuple:
+        sha1(data).hexdigest()
+        return SimpleNamespace(file_id="benchmark"), StandInFile()
+
+
+class StandInDatabase:
+    async def fetch_val(self, query) -> int:
+        return 1
+
+    async def execute(self, query) -> None:
+        pass
+
+
+class StandInRequest:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.headers = {"content-length": str(size)}
+
+    async def stream(self):
+        for _ in range(self.size // len(CHUNK)):
+            yield CHUNK
+
+        if self.size % len(CHUNK):
+            yield CHUNK[:self.size % len(CHUNK)]
+
+
+async def concatenated_upload(size: int) -> None:
+    """How b2 uploads used to assemble parts."""
+
+    parts = StandInParts()
+
+    chunked = b""
+    async for chunk in StandInRequest(size).stream():
+        chunked += chunk
+
+        if len(chunked) >= PART_SIZE:
+            await parts.data(chunked)
+            chunked = b""
+
+        await asyncio.sleep(Config.upload_delay)
+
+    if chunked:
+        await parts.data(chunked)
+
+
+async def buffered_upload(size: int) -> None:
+    await Demo(
+        Match("0" * 36, "Benchmark"), StandInRequest(size)
+    ).upload()
+
+
+def measure(upload, size: int, upload_delay: float = 0) -> float:
+    Config.upload_delay = upload_delay
+    try:
+        start = perf_counter()
+        asyncio.run(upload(size))
+        return perf_counter() - start
+    finally:
+        Config.upload_delay = 0
+
+
+def peak_memory(upload, size: int) -> int:
+    tracemalloc.start()
+    try:
+        asyncio.run(upload(size))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    Config.upload_type = B2UploadSettings
+    Config.demo_pathway = "demos"
+    Config.demo_extension = ".dem"
+    Config.max_upload_size = 2000.0
+    Config.free_upload_size = 2000.0
+    Config.upload_delay = 0
+
+    Sessions.bucket = StandInBucket()
+    Sessions.database = StandInDatabase()
+
+    for size in SIZES:
+        megabytes = size / 1000000
+
+        baseline = measure(concatenated_upload, size)
+        took = measure(buffered_upload, size)
+
+        print("{:.0f} MB, concatenated: {:.1f} MB/s".format(
+            megabytes, megabytes / baseline
+        ))
+        print("{:.0f} MB, part buffer: {:.1f} MB/s ({:.1f}x)".format(
+            megabytes, megabytes / took, baseline / took
+        ))
+
+    megabytes = SIZES[0] / 1000000
+    for name, upload in (("concatenated", concatenated_upload),
+                         ("part buffer", buffered_upload)):
+        without = measure(upload, SIZES[0])
+        took = measure(upload, SIZES[0], UPLOAD_DELAY)
+
+        print("{:.0f} MB, {}, with upload_delay: {:.1f} MB/s "
+              "({:.1f} MB/s without)".format(
+                  megabytes, name, megabytes / took, megabytes / without
+              ))
+
+    for name, upload in (("concatenated", concatenated_upload),
+                         ("part buffer", buffered_upload)):
+        print("{:.0f} MB, {} peak memory: {:.1f} MB".format(
+            megabytes, name, peak_memory(upload, SIZES[0]) / 1000000
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,10 @@ DEALINGS IN THE SOFTWARE.
 import unittest
 
 from SQLMatches.tests.test_match_api import *  # noqa: F403, F401
+from SQLMatches.tests.test_websocket_manager import *  # noqa: F403, F401
+from SQLMatches.tests.test_demos import *  # noqa: F403, F401
+from SQLMatches.tests.test_caches import *  # noqa: F403, F401
+from SQLMatches.tests.test_rollups import *  # noqa: F403, F401
 
 
 if __name__ == "__main__":